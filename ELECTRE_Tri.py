@@ -1,5 +1,8 @@
 import numpy as np
-import csv
+from collections.abc import Mapping
+
+import ELECTRE_Tri_io
+import ELECTRE_Tri_profiling
 
 
 def input_criteria(name):
@@ -15,18 +18,8 @@ def input_criteria(name):
     :return W: Dictionary where the keys are the names of the criteria and the
         values are the corresponding weightings.
     """
-    C = []
-    W = {}
-    with open(name, 'r', newline='') as C_csv:
-        reader = csv.reader(C_csv, delimiter=',')
-        line_count = 0
-        for row in reader:
-            if line_count == 0:
-                [C.append(item) for item in row]
-            else:
-                for j in range(len(row)):
-                    W[C[j]] = float(row[j])
-            line_count += 1
+    C, W = ELECTRE_Tri_io.load_criteria(name)
+    W = dict(zip(C, W.tolist()))
     return C, W
 
 
@@ -45,26 +38,35 @@ def input_performances(name):
         are sub-dictionary where the keys are the criteria and the values are the
         performances.
     """
-    A = []
-    C = []
-    P = {}
-    with open(name, 'r', newline='') as P_csv:
-        reader = csv.reader(P_csv, delimiter=',')
-        line_count = 0
-        for row in reader:
-            if line_count == 0:
-                [A.append(item) for item in row]
-            elif line_count == 1:
-                [C.append(item) for item in row]
-            else:
-                perf_A = {}
-                for j in range(len(row)):
-                    perf_A[C[j]] = float(row[j])
-                P[A[line_count-2]] = perf_A
-            line_count += 1
+    A, C, G = ELECTRE_Tri_io.load_performances(name)
+    P = {action: dict(zip(C, row)) for action, row in zip(A, G.tolist())}
     return A, P
 
 
+def input_profiles(PROFILES, NAMES):
+    """
+    Generates from .csv files the dictionary of reference profiles and thresholds
+    for any number of reference profiles.
+
+    :param PROFILES: List containing the names of the reference profiles, from the
+        lowest to the highest.
+
+    :param NAMES: List containing, for each reference profile, the name of the .csv
+        file which must contain on the first line the names of the criteria and on the
+        following lines, for each criterion, the values of the reference profile, the
+        indifference threshold, the preference threshold and the veto threshold.
+
+    :return T: Dictionary in which the keys are the names of the reference profiles
+        and the values are sub-dictionary in which the keys are the criteria and the values
+        are a list containing the data of bk, qi, pi and vi.
+    """
+    T = {}
+    for profile, name in zip(PROFILES, NAMES):
+        C, B = ELECTRE_Tri_io.load_profile(name)
+        T[profile] = dict(zip(C, B.tolist()))
+    return T
+
+
 def input_thresholds(name_moderate, name_good):
     """
     Generates from a .csv file the dictionary of reference profiles and thresholds.
@@ -83,36 +85,261 @@ def input_thresholds(name_moderate, name_good):
         and the values are sub-dictionary in which the keys are the criteria and the values
         are a list containing the data of bk, qi, pi and vi.
     """
-    C = []
-    Th_moderate = {}
-    with open(name_moderate, 'r', newline='') as th_moderate_csv:
-        reader = csv.reader(th_moderate_csv, delimiter=',')
-        line_count = 0
-        for row in reader:
-            if line_count == 0:
-                [C.append(item) for item in row]
-            else:
-                th = []
-                [th.append(float(item)) for item in row]
-                Th_moderate[C[line_count-1]] = th
-            line_count += 1
-
-    C = []
-    Th_good = {}
-    with open(name_good, 'r', newline='') as th_good_csv:
-        reader = csv.reader(th_good_csv, delimiter=',')
-        line_count = 0
-        for row in reader:
-            if line_count == 0:
-                [C.append(item) for item in row]
-            else:
-                th = []
-                [th.append(float(item)) for item in row]
-                Th_good[C[line_count-1]] = th
-            line_count += 1
-
-    T = {'Moderate': Th_moderate, 'Good': Th_good}
-    return T
+    return input_profiles(['Moderate', 'Good'], [name_moderate, name_good])
+
+
+class ProfileSet:
+    """
+    Ordered set of reference profiles delimiting the categories of the sorting.
+
+    The profiles b1, ..., bK are given from the lowest to the highest and delimit
+    K + 1 categories, from the worst to the best: the category C1 lies below b1,
+    the category Ck+1 between bk and bk+1 and the category CK+1 above bK.
+
+    :param CRITERIA: List containing the names of the criteria as strings.
+
+    :param PROFILES: List containing the names of the reference profiles, from the
+        lowest to the highest.
+
+    :param CATEGORIES: List containing the names of the categories, from the worst
+        to the best. It must contain one more name than PROFILES.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+    """
+
+    def __init__(self, CRITERIA, PROFILES, CATEGORIES, B):
+        B = np.asarray(B, dtype=float)
+        if B.shape != (len(PROFILES), len(CRITERIA), 4):
+            raise ValueError('The profile array must have the shape (profiles, criteria, 4), got '
+                             + str(B.shape) + '.')
+        if len(CATEGORIES) != len(PROFILES) + 1:
+            raise ValueError('There must be exactly one more category than reference profiles.')
+        if np.any(np.diff(B[:, :, 0], axis=0) < 0):
+            raise ValueError('The reference profiles must be given from the lowest to the highest.')
+        self.criteria = list(CRITERIA)
+        self.profiles = list(PROFILES)
+        self.categories = list(CATEGORIES)
+        self.values = B
+
+    @classmethod
+    def from_thresholds(cls, CRITERIA, THRESHOLDS, PROFILES, CATEGORIES):
+        """
+        Builds the profile set from the dictionary of reference profiles and thresholds.
+
+        :param CRITERIA: List containing the names of the criteria as strings.
+
+        :param THRESHOLDS: Dictionary of reference profiles and thresholds.
+
+        :param PROFILES: List containing the names of the reference profiles, from the
+            lowest to the highest.
+
+        :param CATEGORIES: List containing the names of the categories, from the worst
+            to the best.
+
+        :return: ProfileSet instance.
+        """
+        return cls(CRITERIA, PROFILES, CATEGORIES, profile_array(CRITERIA, THRESHOLDS, PROFILES))
+
+    @classmethod
+    def from_csv(cls, CRITERIA, PROFILES, CATEGORIES, NAMES):
+        """
+        Builds the profile set from one .csv file per reference profile, with the
+        structure expected by input_profiles.
+
+        :param CRITERIA: List containing the names of the criteria as strings.
+
+        :param PROFILES: List containing the names of the reference profiles, from the
+            lowest to the highest.
+
+        :param CATEGORIES: List containing the names of the categories, from the worst
+            to the best.
+
+        :param NAMES: List containing the names of the .csv files of the profiles.
+
+        :return: ProfileSet instance.
+        """
+        return cls.from_thresholds(CRITERIA, input_profiles(PROFILES, NAMES), PROFILES, CATEGORIES)
+
+    def compile(self):
+        """
+        Compiles the profiles for the evaluation of many performance matrices.
+
+        :return: CompiledProfiles instance.
+        """
+        return CompiledProfiles(self.values)
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def __repr__(self):
+        return 'ProfileSet(profiles=' + str(self.profiles) + ', categories=' + str(self.categories) + ')'
+
+
+class CompiledProfiles:
+    """
+    Reference profiles and thresholds compiled for the evaluation of many performance
+    matrices. On each criterion, the partial concordance and discordance indices are
+    piecewise-linear functions of the performance, constant outside the breakpoints
+    bk - pk, bk - qk, bk + pk and bk + vk. Their slopes and intercepts are computed once,
+    so that evaluating a performance matrix only takes a multiplication, an addition and
+    a clip, which may differ from concordance_tensor and discordance_tensor in the last
+    bits. The object only holds arrays: it can be pickled and sent to worker processes,
+    and np.asarray returns the array of profiles.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk, with qk < pk < vk.
+    """
+
+    def __init__(self, B):
+        B = np.array(B, dtype=float)
+        b, q, p, v = (B[..., t] for t in range(4))
+        if np.any(p <= q) or np.any(v <= p):
+            raise ValueError('The thresholds must satisfy qk < pk < vk to be compiled.')
+        self.values = B
+        # Slopes and intercepts of the indices, in the order of the keys, of shape
+        # (profiles, 1, criteria) to broadcast over the actions.
+        Concordance = 1 / (p - q)
+        Discordance = 1 / (v - p)
+        self.slopes = {'concordance': {'(ai,bk)': Concordance, '(bk,ai)': -Concordance},
+                       'discordance': {'(ai,bk)': -Discordance, '(bk,ai)': Discordance}}
+        self.intercepts = {'concordance': {'(ai,bk)': (p - b) * Concordance, '(bk,ai)': (b + p) * Concordance},
+                           'discordance': {'(ai,bk)': (b - p) * Discordance, '(bk,ai)': -(b + p) * Discordance}}
+        for Arrays in (self.slopes, self.intercepts):
+            for index in Arrays.values():
+                for key in index:
+                    index[key] = index[key][:, np.newaxis, :]
+
+    def _evaluate(self, G, INDEX):
+        G = np.asarray(G, dtype=float)
+        Index = {}
+        for key, Slope in self.slopes[INDEX].items():
+            Index[key] = np.multiply(G, Slope)
+            Index[key] += self.intercepts[INDEX][key]
+            np.clip(Index[key], 0, 1, out=Index[key])
+        return Index
+
+    def concordance(self, G):
+        """
+        Partial concordance indices of a performance matrix, as concordance_tensor.
+
+        :param G: Array of shape (actions, criteria) containing the performances.
+
+        :return Concordance: Dictionary containing two arrays of shape
+            (profiles, actions, criteria). The keys are '(ai,bk)' and '(bk,ai)'.
+        """
+        return self._evaluate(G, 'concordance')
+
+    def discordance(self, G):
+        """
+        Partial discordance indices of a performance matrix, as discordance_tensor.
+
+        :param G: Array of shape (actions, criteria) containing the performances.
+
+        :return Discordance: Dictionary containing two arrays of shape
+            (profiles, actions, criteria). The keys are '(ai,bk)' and '(bk,ai)'.
+        """
+        return self._evaluate(G, 'discordance')
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return 'CompiledProfiles(profiles=' + str(self.values.shape[0]) + ', criteria=' + str(self.values.shape[1]) + ')'
+
+
+def performance_matrix(CRITERIA, ACTIONS, PERFORMANCES):
+    """
+    Builds the dense performance matrix from the performance dictionary.
+
+    :param CRITERIA: List containing the names of the criteria as strings.
+
+    :param ACTIONS: List containing the names of the actions as strings.
+
+    :param PERFORMANCES: Performance dictionary.
+
+    :return G: Array of shape (actions, criteria) containing the performance of each
+        action against each criterion, in the order of ACTIONS and CRITERIA.
+    """
+    G = np.empty((len(ACTIONS), len(CRITERIA)))
+    for i, action in enumerate(ACTIONS):
+        G[i] = [PERFORMANCES[action][criteria] for criteria in CRITERIA]
+    return G
+
+
+def profile_array(CRITERIA, THRESHOLDS, PROFILES):
+    """
+    Builds the dense array of reference profiles and thresholds.
+
+    :param CRITERIA: List containing the names of the criteria as strings.
+
+    :param THRESHOLDS: Dictionary of reference profiles and thresholds.
+
+    :param PROFILES: List containing the names of the reference profiles, in the
+        order in which they must be stacked.
+
+    :return B: Array of shape (profiles, criteria, 4) where the last axis contains
+        the values of bk, qk, pk and vk.
+    """
+    B = np.empty((len(PROFILES), len(CRITERIA), 4))
+    for k, profile in enumerate(PROFILES):
+        B[k] = [THRESHOLDS[profile][criteria] for criteria in CRITERIA]
+    return B
+
+
+def concordance_tensor(G, B):
+    """
+    Calculates the partial concordance indices of every action against every
+    reference profile in a single pass.
+
+    :param G: Array of shape (actions, criteria) containing the performances.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk, or CompiledProfiles.
+
+    :return Concordance: Dictionary containing two arrays of shape
+        (profiles, actions, criteria). The keys are '(ai,bk)' and '(bk,ai)'.
+    """
+    with ELECTRE_Tri_profiling.stage('concordance', actions=len(G), profiles=len(B),
+                                      elements=len(B) * np.size(G)):
+        if isinstance(B, CompiledProfiles):
+            return B.concordance(G)
+        G = np.asarray(G, dtype=float)
+        B = np.asarray(B, dtype=float)
+        gbk, qbk, pbk = (B[:, np.newaxis, :, t] for t in range(3))
+        Concordance = {}
+        Concordance['(ai,bk)'] = np.clip((G - gbk + pbk) / (pbk - qbk), 0, 1)
+        Concordance['(bk,ai)'] = np.clip((gbk - G + pbk) / (pbk - qbk), 0, 1)
+        return Concordance
+
+
+def discordance_tensor(G, B):
+    """
+    Calculates the partial discordance indices of every action against every
+    reference profile in a single pass.
+
+    :param G: Array of shape (actions, criteria) containing the performances.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk, or CompiledProfiles.
+
+    :return Discordance: Dictionary containing two arrays of shape
+        (profiles, actions, criteria). The keys are '(ai,bk)' and '(bk,ai)'.
+    """
+    with ELECTRE_Tri_profiling.stage('discordance', actions=len(G), profiles=len(B),
+                                      elements=len(B) * np.size(G)):
+        if isinstance(B, CompiledProfiles):
+            return B.discordance(G)
+        G = np.asarray(G, dtype=float)
+        B = np.asarray(B, dtype=float)
+        gbk, pbk, vbk = (B[:, np.newaxis, :, t] for t in (0, 2, 3))
+        Discordance = {}
+        Discordance['(ai,bk)'] = np.clip((gbk - G - pbk) / (vbk - pbk), 0, 1)
+        Discordance['(bk,ai)'] = np.clip((G - gbk - pbk) / (vbk - pbk), 0, 1)
+        return Discordance
 
 
 def concordance(CRITERIA, ACTIONS, PERFORMANCES, THRESHOLDS, CATEGORIES):
@@ -134,24 +361,10 @@ def concordance(CRITERIA, ACTIONS, PERFORMANCES, THRESHOLDS, CATEGORIES):
         actions with regard to the reference profile chosen as input.
         The keys are '(ai,bk)' and '(bk,ai)'.
     """
-    Concordance = {}
-    conc_2D_1 = np.empty((0, len(CRITERIA)))
-    conc_2D_2 = np.empty((0, len(CRITERIA)))
-    for action in ACTIONS:
-        conc_1D_1 = []
-        conc_1D_2 = []
-        for criteria in CRITERIA:
-            gbk, qbk, pbk, vbk = THRESHOLDS[CATEGORIES][criteria]
-            gai = PERFORMANCES[action][criteria]
-            c1 = min(1, max(0, (gai - gbk + pbk) / (pbk - qbk)))
-            c2 = min(1, max(0, (gbk - gai + pbk) / (pbk - qbk)))
-            conc_1D_1.append(c1)
-            conc_1D_2.append(c2)
-        conc_2D_1 = np.vstack((conc_2D_1, conc_1D_1))
-        conc_2D_2 = np.vstack((conc_2D_2, conc_1D_2))
-    Concordance['(ai,bk)'] = conc_2D_1
-    Concordance['(bk,ai)'] = conc_2D_2
-    return Concordance
+    G = performance_matrix(CRITERIA, ACTIONS, PERFORMANCES)
+    B = profile_array(CRITERIA, THRESHOLDS, [CATEGORIES])
+    Concordance = concordance_tensor(G, B)
+    return {key: value[0] for key, value in Concordance.items()}
 
 
 def discordance(CRITERIA, ACTIONS, PERFORMANCES, THRESHOLDS, CATEGORIES):
@@ -173,24 +386,121 @@ def discordance(CRITERIA, ACTIONS, PERFORMANCES, THRESHOLDS, CATEGORIES):
         actions with regard to the reference profile chosen as input.
         The keys are '(ai,bk)' and '(bk,ai)'.
     """
-    Discordance = {}
-    disc_2D_1 = np.empty((0, len(CRITERIA)))
-    disc_2D_2 = np.empty((0, len(CRITERIA)))
-    for action in ACTIONS:
-        disc_1D_1 = []
-        disc_1D_2 = []
-        for criteria in CRITERIA:
-            gbk, qbk, pbk, vbk = THRESHOLDS[CATEGORIES][criteria]
-            gai = PERFORMANCES[action][criteria]
-            d1 = min(1, max(0, (gbk - gai - pbk) / (vbk - pbk)))
-            d2 = min(1, max(0, (gai - gbk - pbk) / (vbk - pbk)))
-            disc_1D_1.append(d1)
-            disc_1D_2.append(d2)
-        disc_2D_1 = np.vstack((disc_2D_1, disc_1D_1))
-        disc_2D_2 = np.vstack((disc_2D_2, disc_1D_2))
-    Discordance['(ai,bk)'] = disc_2D_1
-    Discordance['(bk,ai)'] = disc_2D_2
-    return Discordance
+    G = performance_matrix(CRITERIA, ACTIONS, PERFORMANCES)
+    B = profile_array(CRITERIA, THRESHOLDS, [CATEGORIES])
+    Discordance = discordance_tensor(G, B)
+    return {key: value[0] for key, value in Discordance.items()}
+
+
+def weight_vector(CRITERIA, WEIGHTS):
+    """
+    Builds the vector of weights in the order of the criteria.
+
+    :param CRITERIA: List containing the names of the criteria as strings.
+
+    :param WEIGHTS: Dictionary containing the weightings of each criterion.
+
+    :return W: Array of shape (criteria,) containing the weightings.
+    """
+    return np.array([WEIGHTS[criteria] for criteria in CRITERIA], dtype=float)
+
+
+def _credibility_kernel(GC, D, OUT):
+    """
+    Writes into OUT the credibility values obtained from the global concordance
+    GC, of shape (...), and the discordance D, of shape (..., criteria). Only the
+    criteria whose discordance exceeds the global concordance weaken the result:
+    (1 - dj) / (1 - C) is below 1 exactly for those criteria, so that clipping the
+    ratios at 1 applies the veto without any branch.
+    """
+    GC = GC[..., np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Factor = np.divide(1 - D, np.maximum(1 - GC, 0))
+    np.fmin(Factor, 1, out=Factor)
+    np.prod(Factor, axis=-1, out=OUT)
+    OUT *= GC[..., 0]
+    return OUT
+
+
+def global_concordance_tensor(CONCORDANCE, W):
+    """
+    Calculates the global concordance of every action with every reference profile
+    as a weighted matrix product.
+
+    :param CONCORDANCE: Dictionary of partial concordance arrays of shape
+        (..., criteria), as returned by concordance_tensor.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :return Global_concordance: Dictionary containing the arrays of global
+        concordance of shape (...). The keys are '(ai,bk)' and '(bk,ai)'.
+    """
+    with ELECTRE_Tri_profiling.stage('global_concordance', criteria=len(W)):
+        W = np.asarray(W, dtype=float)
+        W = W / W.sum()
+        return {key: np.asarray(value) @ W for key, value in CONCORDANCE.items()}
+
+
+def credibility_tensor(GLOBAL_CONCORDANCE, DISCORDANCE):
+    """
+    Calculates the credibility of every action with every reference profile from
+    the global concordance and the partial discordance arrays.
+
+    :param GLOBAL_CONCORDANCE: Dictionary of global concordance arrays of
+        shape (...), as returned by global_concordance_tensor.
+
+    :param DISCORDANCE: Dictionary of partial discordance arrays of shape
+        (..., criteria), as returned by discordance_tensor.
+
+    :return Credibility: Dictionary containing the arrays of credibility of
+        shape (...). The keys are '(ai,bk)' and '(bk,ai)'.
+    """
+    with ELECTRE_Tri_profiling.stage('credibility'):
+        Credibility = {}
+        for key, GC in GLOBAL_CONCORDANCE.items():
+            GC = np.asarray(GC, dtype=float)
+            Credibility[key] = _credibility_kernel(GC, np.asarray(DISCORDANCE[key], dtype=float),
+                                                   np.empty(GC.shape))
+        return Credibility
+
+
+def credibility_pipeline(G, B, W, CHUNK_SIZE=4096):
+    """
+    Calculates the credibility of every action with every reference profile, in
+    both directions, directly from the performances. The actions are processed by
+    blocks of CHUNK_SIZE rows so that the intermediate concordance and discordance
+    arrays never exceed (profiles, CHUNK_SIZE, criteria) elements.
+
+    :param G: Array of shape (actions, criteria) containing the performances.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk, or CompiledProfiles to reuse across
+        many performance matrices.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :param CHUNK_SIZE: Number of actions processed at once.
+
+    :return Credibility: Dictionary containing two arrays of shape (profiles, actions).
+        The keys are '(ai,bk)' and '(bk,ai)'.
+    """
+    with ELECTRE_Tri_profiling.stage('credibility_pipeline', actions=len(G), profiles=len(B),
+                                      elements=len(B) * np.size(G)):
+        G = np.asarray(G, dtype=float)
+        if not isinstance(B, CompiledProfiles):
+            B = np.asarray(B, dtype=float)
+        W = np.asarray(W, dtype=float)
+        W = W / W.sum()
+        Credibility = {'(ai,bk)': np.empty((len(B), len(G))),
+                       '(bk,ai)': np.empty((len(B), len(G)))}
+        for start in range(0, len(G), CHUNK_SIZE):
+            stop = min(start + CHUNK_SIZE, len(G))
+            Concordance = concordance_tensor(G[start:stop], B)
+            Discordance = discordance_tensor(G[start:stop], B)
+            for key in Credibility:
+                _credibility_kernel(Concordance[key] @ W, Discordance[key],
+                                    Credibility[key][:, start:stop])
+        return Credibility
 
 
 def global_concordance(CONCORDANCE, CRITERIA, ACTIONS, WEIGHTS):
@@ -212,21 +522,9 @@ def global_concordance(CONCORDANCE, CRITERIA, ACTIONS, WEIGHTS):
         defined in input bk, and of bk with the actions Si.
         The keys are '(ai,bk)' and '(bk,ai)'.
     """
-    Global_concordance = {}
-    weights_sum = sum(WEIGHTS.values())
-    glob_conc_1D_1 = []
-    glob_conc_1D_2 = []
-    for i in range(len(ACTIONS)):
-        gc1 = 0.0
-        gc2 = 0.0
-        for j in range(len(CRITERIA)):
-            gc1 = gc1 + (WEIGHTS[CRITERIA[j]] * CONCORDANCE['(ai,bk)'][i][j]) / weights_sum
-            gc2 = gc2 + (WEIGHTS[CRITERIA[j]] * CONCORDANCE['(bk,ai)'][i][j]) / weights_sum
-        glob_conc_1D_1.append(gc1)
-        glob_conc_1D_2.append(gc2)
-    Global_concordance['(ai,bk)'] = glob_conc_1D_1
-    Global_concordance['(bk,ai)'] = glob_conc_1D_2
-    return Global_concordance
+    W = weight_vector(CRITERIA, WEIGHTS)
+    Global_concordance = global_concordance_tensor(CONCORDANCE, W)
+    return {key: value.tolist() for key, value in Global_concordance.items()}
 
 
 def credibility(GLOBAL_CONCORDANCE, DISCORDANCE, CRITERIA, ACTIONS):
@@ -250,26 +548,205 @@ def credibility(GLOBAL_CONCORDANCE, DISCORDANCE, CRITERIA, ACTIONS):
         profile defined as input bk, and to the over ranking of de bk by the
         actions Si. The keys are '(ai,bk)' and '(bk,ai)'.
     """
-    Credibility = {}
-    cred_1 = []
-    cred_2 = []
-    for i in range(len(ACTIONS)):
-        cr1 = 1
-        cr2 = 1
-        for j in range(len(CRITERIA)):
-            if DISCORDANCE['(ai,bk)'][i][j] > GLOBAL_CONCORDANCE['(ai,bk)'][i]:
-                cr1 = cr1 * (1 - DISCORDANCE['(ai,bk)'][i][j]) / (1 - GLOBAL_CONCORDANCE['(ai,bk)'][i])
-            else:
-                cr1 = cr1 * 1
-            if DISCORDANCE['(bk,ai)'][i][j] > GLOBAL_CONCORDANCE['(bk,ai)'][i]:
-                cr2 = cr2 * (1 - DISCORDANCE['(bk,ai)'][i][j]) / (1 - GLOBAL_CONCORDANCE['(bk,ai)'][i])
-            else:
-                cr2 = cr2 * 1
-        cred_1.append(cr1 * GLOBAL_CONCORDANCE['(ai,bk)'][i])
-        cred_2.append(cr2 * GLOBAL_CONCORDANCE['(bk,ai)'][i])
-    Credibility['(ai,bk)'] = cred_1
-    Credibility['(bk,ai)'] = cred_2
-    return Credibility
+    Credibility = credibility_tensor(GLOBAL_CONCORDANCE, DISCORDANCE)
+    return {key: value.tolist() for key, value in Credibility.items()}
+
+
+def _category_dtype(N_PROFILES):
+    """
+    Smallest unsigned integer type able to hold the category numbers 1 to N_PROFILES + 1.
+    """
+    return np.min_scalar_type(N_PROFILES + 1)
+
+
+def _threshold_details(LAMBDA):
+    """
+    Cutting threshold recorded by the profiling stages. Thresholds given per action are
+    not recorded, so that the events stay small and serialisable to JSON.
+    """
+    return {'threshold': float(LAMBDA)} if np.ndim(LAMBDA) == 0 else {}
+
+
+def outranking(CREDIBILITY, LAMBDA):
+    """
+    Builds the boolean outranking matrices using the credibility arrays and the
+    cutting threshold.
+
+    :param CREDIBILITY: Dictionary containing the credibility arrays of shape
+        (profiles, actions), as returned by credibility_pipeline.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :return Outranking: Dictionary containing two boolean arrays of shape
+        (profiles, actions). The value of '(ai,bk)' is True when ai outranks bk and
+        the value of '(bk,ai)' is True when bk outranks ai.
+    """
+    with ELECTRE_Tri_profiling.stage('outranking', **_threshold_details(LAMBDA)):
+        return {key: np.asarray(value) >= LAMBDA for key, value in CREDIBILITY.items()}
+
+
+def pessimistic_assignment(OUTRANKING):
+    """
+    Assigns every action to a category according to the pessimistic procedure: each
+    action is compared to the profiles from the highest to the lowest and is assigned
+    to the category just above the first profile it outranks.
+
+    :param OUTRANKING: Dictionary of boolean outranking arrays of shape
+        (profiles, actions), as returned by outranking.
+
+    :return Category: Array of shape (actions,) containing the number of the category
+        of each action, from 1 (worst) to profiles + 1 (best).
+    """
+    with ELECTRE_Tri_profiling.stage('pessimistic_assignment'):
+        S = np.asarray(OUTRANKING['(ai,bk)'], dtype=bool)
+        S = np.vstack((np.ones((1, S.shape[1]), dtype=bool), S))
+        return (len(S) - np.argmax(S[::-1], axis=0)).astype(_category_dtype(len(S) - 1))
+
+
+def optimistic_assignment(OUTRANKING):
+    """
+    Assigns every action to a category according to the optimistic procedure: each
+    action is compared to the profiles from the lowest to the highest and is assigned
+    to the category just below the first profile it does not outrank.
+
+    :param OUTRANKING: Dictionary of boolean outranking arrays of shape
+        (profiles, actions), as returned by outranking.
+
+    :return Category: Array of shape (actions,) containing the number of the category
+        of each action, from 1 (worst) to profiles + 1 (best).
+    """
+    with ELECTRE_Tri_profiling.stage('optimistic_assignment'):
+        S = np.asarray(OUTRANKING['(ai,bk)'], dtype=bool)
+        S = np.vstack((~S, np.ones((1, S.shape[1]), dtype=bool)))
+        return (np.argmax(S, axis=0) + 1).astype(_category_dtype(len(S) - 1))
+
+
+def assignment_stream(BLOCKS, B, W, LAMBDA, CHUNK_SIZE=4096):
+    """
+    Assigns the actions to the categories block by block, so that arbitrarily large
+    performance tables can be processed with a bounded amount of memory.
+
+    :param BLOCKS: Iterable over the tuples (A, G) where A is the list of the names of
+        the actions of a block and G the array of shape (actions, criteria) of their
+        performances, such as an ELECTRE_Tri_io.PerformanceStream.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :param CHUNK_SIZE: Number of actions processed at once inside a block.
+
+    :return: Iterator over the tuples (A, pessimistic, optimistic) where pessimistic and
+        optimistic are the arrays of category numbers of the actions of the block.
+    """
+    for A, G in BLOCKS:
+        Outranking = outranking(credibility_pipeline(G, B, W, CHUNK_SIZE), LAMBDA)
+        yield A, pessimistic_assignment(Outranking), optimistic_assignment(Outranking)
+
+
+RELATIONS = ('R', '>', '<', 'I')
+
+
+def over_ranking_codes(CREDIBILITY, LAMBDA):
+    """
+    Packs the outranking relations between the actions and the reference profiles into
+    one byte per pair. The bit 0 is set when ai outranks bk and the bit 1 when bk
+    outranks ai, so that the codes 0, 1, 2 and 3 stand for the relations 'R', '>', '<'
+    and 'I' (RELATIONS[code]).
+
+    :param CREDIBILITY: Dictionary containing the credibility arrays of shape
+        (profiles, actions), as returned by credibility_pipeline.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :return Codes: Array of dtype uint8 and shape (profiles, actions).
+    """
+    with ELECTRE_Tri_profiling.stage('over_ranking_codes', **_threshold_details(LAMBDA)):
+        Codes = (np.asarray(CREDIBILITY['(ai,bk)']) >= LAMBDA).view(np.uint8)
+        Codes |= (np.asarray(CREDIBILITY['(bk,ai)']) >= LAMBDA).view(np.uint8) << 1
+        return Codes
+
+
+class OverRanking(Mapping):
+    """
+    Read-only dictionary view of the over ranking relations, stored as the packed codes
+    of over_ranking_codes. The keys are 'Floor', the names of the profiles and 'Roof',
+    and each value is the list of the symbols '>', '<', 'I' and 'R' of the actions,
+    built on lookup. 'Floor' is always preferred ('>') and 'Roof' never ('<'), so that
+    they are not stored.
+
+    :param PROFILES: List containing the names of the reference profiles, from the
+        lowest to the highest.
+
+    :param CODES: Array of dtype uint8 and shape (profiles, actions) containing the codes
+        of the relations.
+    """
+
+    def __init__(self, PROFILES, CODES):
+        self.profiles = list(PROFILES)
+        self.codes = np.asarray(CODES, dtype=np.uint8).reshape(len(self.profiles), -1)
+
+    @property
+    def outranking(self):
+        """
+        Dictionary containing the boolean outranking arrays of shape (profiles, actions),
+        as returned by outranking.
+        """
+        return {'(ai,bk)': (self.codes & 1).astype(bool), '(bk,ai)': (self.codes & 2).astype(bool)}
+
+    def counts(self):
+        """
+        Number of actions in each relation with each profile.
+
+        :return Counts: Dictionary in which the keys are the names of the profiles and the
+            values are dictionaries giving the number of actions for each relation.
+        """
+        return {profile: dict(zip(RELATIONS, np.bincount(Codes, minlength=4).tolist()))
+                for profile, Codes in zip(self.profiles, self.codes)}
+
+    def __getitem__(self, profile):
+        if profile == 'Floor':
+            return ['>'] * self.codes.shape[1]
+        if profile == 'Roof':
+            return ['<'] * self.codes.shape[1]
+        try:
+            k = self.profiles.index(profile)
+        except ValueError:
+            raise KeyError(profile) from None
+        return np.array(RELATIONS)[self.codes[k]].tolist()
+
+    def __iter__(self):
+        return iter(['Floor'] + self.profiles + ['Roof'])
+
+    def __len__(self):
+        return len(self.profiles) + 2
+
+    def __repr__(self):
+        return 'OverRanking(profiles=' + str(self.profiles) + ', actions=' + str(self.codes.shape[1]) + ')'
+
+
+def over_ranking_symbols(CREDIBILITY, PROFILES, LAMBDA):
+    """
+    Built the over ranking relations matrix for any number of reference profiles using
+    the credibility arrays and the cutting threshold. The relations are coded as in
+    over_ranking_relations, but stored packed, one byte per action and profile.
+
+    :param CREDIBILITY: Dictionary containing the credibility arrays of shape
+        (profiles, actions), as returned by credibility_pipeline.
+
+    :param PROFILES: List containing the names of the reference profiles, from the
+        lowest to the highest.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :return over_ranking: OverRanking dictionary view containing the over ranking
+        relation and where the keys are 'Floor', the names of the profiles and 'Roof'.
+    """
+    with ELECTRE_Tri_profiling.stage('over_ranking_symbols', profiles=len(PROFILES)):
+        return OverRanking(PROFILES, over_ranking_codes(CREDIBILITY, LAMBDA))
 
 
 def over_ranking_relations(CREDIBILITY_MODERATE, CREDIBILITY_GOOD, LAMBDA):
@@ -289,115 +766,208 @@ def over_ranking_relations(CREDIBILITY_MODERATE, CREDIBILITY_GOOD, LAMBDA):
 
     :param LAMBDA: Cutting threshold value.
 
-    :return over_ranking: Dictionary containing the over ranking relation and where
-        the keys are 'Floor', 'Moderate', 'Good' and 'Roof', représenting the limits
-        and boundaries of the three different categories.
-    """
-    over_ranking_floor = []
-    over_ranking_moderate = []
-    over_ranking_good = []
-    over_ranking_roof = []
-    over_ranking = {}
-
-    for i in range(len(CREDIBILITY_MODERATE['(ai,bk)'])):
-        over_ranking_floor.append('>')
-        if CREDIBILITY_MODERATE['(ai,bk)'][i] >= LAMBDA:
-            if CREDIBILITY_MODERATE['(bk,ai)'][i] >= LAMBDA:
-                over_ranking_moderate.append('I')
-            else:
-                over_ranking_moderate.append('>')
-        else:
-            if CREDIBILITY_MODERATE['(bk,ai)'][i] >= LAMBDA:
-                over_ranking_moderate.append('<')
-            else:
-                over_ranking_moderate.append('R')
-
-    for i in range(len(CREDIBILITY_GOOD['(ai,bk)'])):
-        over_ranking_roof.append('<')
-        if CREDIBILITY_GOOD['(ai,bk)'][i] >= LAMBDA:
-            if CREDIBILITY_GOOD['(bk,ai)'][i] >= LAMBDA:
-                over_ranking_good.append('I')
-            else:
-                over_ranking_good.append('>')
-        else:
-            if CREDIBILITY_GOOD['(bk,ai)'][i] >= LAMBDA:
-                over_ranking_good.append('<')
-            else:
-                over_ranking_good.append('R')
-
-    over_ranking['Floor'] = over_ranking_floor
-    over_ranking['Moderate'] = over_ranking_moderate
-    over_ranking['Good'] = over_ranking_good
-    over_ranking['Roof'] = over_ranking_roof
-    return over_ranking
+    :return over_ranking: OverRanking dictionary view containing the over ranking
+        relation and where the keys are 'Floor', 'Moderate', 'Good' and 'Roof',
+        représenting the limits and boundaries of the three different categories. The
+        packed codes of the relations are available as `over_ranking.codes`.
+    """
+    Credibility = {key: np.vstack((CREDIBILITY_MODERATE[key], CREDIBILITY_GOOD[key]))
+                   for key in ('(ai,bk)', '(bk,ai)')}
+    return over_ranking_symbols(Credibility, ['Moderate', 'Good'], LAMBDA)
+
+
+def _symbols_to_outranking(ACTIONS, OVER_RANKING):
+    """
+    Converts the over ranking relations, without their 'Floor' and 'Roof' bounds, into
+    the boolean outranking arrays used by the assignment procedures. The codes of an
+    OverRanking are used directly and only plain dictionaries of symbols are parsed.
+    """
+    if isinstance(OVER_RANKING, OverRanking):
+        return OVER_RANKING.outranking
+    Profiles = [key for key in OVER_RANKING if key not in ('Floor', 'Roof')]
+    Symbols = np.array([OVER_RANKING[profile] for profile in Profiles], dtype=str)
+    Symbols = Symbols.reshape(len(Profiles), len(ACTIONS))
+    return {'(ai,bk)': (Symbols == '>') | (Symbols == 'I'),
+            '(bk,ai)': (Symbols == '<') | (Symbols == 'I')}
+
+
+class ActionValues(Mapping):
+    """
+    Read-only dictionary view over an array holding one value per action, such as the
+    category numbers returned by the sorting procedures or the median ranks. The keys
+    are the names of the actions and the underlying array is available as `values`.
+    The index of the actions is only built on the first lookup by name.
+
+    :param ACTIONS: List containing the names of the actions as strings.
+
+    :param VALUES: Array of shape (actions,).
+    """
+
+    def __init__(self, ACTIONS, VALUES):
+        self.actions = ACTIONS.tolist() if isinstance(ACTIONS, np.ndarray) else ACTIONS
+        self.values = np.asarray(VALUES)
+        self._index = None
+
+    def __getitem__(self, action):
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.actions)}
+        return self.values[self._index[action]].item()
+
+    def __iter__(self):
+        return iter(self.actions)
+
+    def __len__(self):
+        return len(self.actions)
+
+    def __repr__(self):
+        return repr(dict(zip(self.actions, self.values.tolist())))
+
+
+class CategoryMembers(Mapping):
+    """
+    Read-only dictionary view giving the actions contained in each category. The keys
+    are the names of the categories and the values are arrays of action names, in the
+    order of ACTIONS. The actions are bucketed once, on the first lookup, with a stable
+    argsort of the category numbers.
+
+    :param ACTIONS: List containing the names of the actions as strings.
+
+    :param CATEGORY: Array of shape (actions,) containing the category numbers, from
+        1 to the number of categories.
+
+    :param CATEGORIES: List containing the names of the categories, from the worst
+        to the best.
+    """
+
+    def __init__(self, ACTIONS, CATEGORY, CATEGORIES):
+        self.actions = ACTIONS
+        self.category = np.asarray(CATEGORY)
+        self.categories = list(CATEGORIES)
+        self._order = None
+        self._offsets = None
+
+    @property
+    def counts(self):
+        """
+        Array containing the number of actions in each category.
+        """
+        return np.bincount(self.category, minlength=len(self.categories) + 1)[1:]
+
+    def __getitem__(self, cat):
+        try:
+            c = self.categories.index(cat)
+        except ValueError:
+            raise KeyError(cat) from None
+        if self._order is None:
+            self._order = np.argsort(self.category, kind='stable')
+            self._offsets = np.concatenate(([0], np.cumsum(self.counts)))
+            self.actions = np.asarray(self.actions, dtype=str)
+        return self.actions[self._order[self._offsets[c]:self._offsets[c + 1]]]
+
+    def __iter__(self):
+        return iter(self.categories)
+
+    def __len__(self):
+        return len(self.categories)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def sorting_views(ACTIONS, CATEGORY, CATEGORIES):
+    """
+    Wraps an array of category numbers into the ranking and category views returned
+    by the sorting procedures.
+
+    :param ACTIONS: List containing the names of the actions as strings.
+
+    :param CATEGORY: Array of shape (actions,) containing the category numbers, as
+        returned by pessimistic_assignment or optimistic_assignment.
+
+    :param CATEGORIES: List containing the names of the categories, from the worst
+        to the best.
+
+    :return: ranking: CategoryMembers view of the actions contained in each category.
+
+    :return: category: ActionValues view of the category number of each action.
+    """
+    return CategoryMembers(ACTIONS, CATEGORY, CATEGORIES), ActionValues(ACTIONS, CATEGORY)
+
+
+def _check_categories(CATEGORIES, N_PROFILES):
+    """
+    Raises ValueError unless there is exactly one more category than reference profiles.
+    """
+    if len(CATEGORIES) != N_PROFILES + 1:
+        raise ValueError('There must be exactly one more category than reference profiles, got '
+                         + str(len(CATEGORIES)) + ' categories for ' + str(N_PROFILES) + ' profiles.')
+
+
+def _action_values(ACTIONS, VALUES):
+    """
+    Array of the values of a per-action dictionary, in the order of ACTIONS. The
+    underlying array of ActionValues views is used directly when they list the same
+    actions in the same order.
+    """
+    if isinstance(VALUES, ActionValues) and (VALUES.actions is ACTIONS or list(VALUES.actions) == list(ACTIONS)):
+        return VALUES.values
+    return np.array([VALUES[action] for action in ACTIONS])
 
 
 def pessimistic_sorting(ACTIONS, OVER_RANKING, CATEGORIES):
     """
-    Ranks actions in the three different categories according to a pessimistic procedure.
+    Ranks actions in the different categories according to a pessimistic procedure.
 
     :param ACTIONS: List containing the names of the actions as strings.
 
-    :param OVER_RANKING: Dictionary containing the over ranking relations.
+    :param OVER_RANKING: Dictionary containing the over ranking relations, with the
+        profiles given from the lowest to the highest between 'Floor' and 'Roof'.
 
-    :param CATEGORIES: List containing the names of the three different categories.
+    :param CATEGORIES: List containing the names of the different categories, from
+        the worst to the best.
 
-    :return: ranking: Dictionary containing the rank of each actions according to a
-        pessimistic procedure. The keys are the actions and the values are the median ranks.
+    :return: ranking: Dictionary view containing the different categories and the
+        actions they contain. The keys are the categories, for instance 'Bad', 'Moderate',
+        and 'Good'. The values are arrays containing the actions.
 
-    :return: category: Dictionary containing the three different categories and the actions
-        they contain. The keys are the categories 'Bad', 'Moderate', and 'Good'. The values
-        are lists containing the actions.
+    :return: category: Dictionary view containing the category of each action according
+        to a pessimistic procedure. The keys are the actions and the values are the numbers
+        of the categories, from 1 (worst) to the number of categories (best). The compact
+        array of category numbers is available as `category.values`.
     """
-    ranking = {}
-    category = {}
-    for cat in CATEGORIES:
-        ranking[cat] = np.array([])
-    for i in range(len(ACTIONS)):
-        if OVER_RANKING['Good'][i] == '>' or OVER_RANKING['Good'][i] == 'I':
-            ranking['Good'] = np.append(ranking['Good'], ACTIONS[i])
-            category[ACTIONS[i]] = 3
-        elif OVER_RANKING['Moderate'][i] == '>' or OVER_RANKING['Moderate'][i] == 'I':
-            ranking['Moderate'] = np.append(ranking['Moderate'], ACTIONS[i])
-            category[ACTIONS[i]] = 2
-        elif OVER_RANKING['Floor'][i] == '>' or OVER_RANKING['Floor'][i] == 'I':
-            ranking['Bad'] = np.append(ranking['Bad'], ACTIONS[i])
-            category[ACTIONS[i]] = 1
-    return ranking, category
+    with ELECTRE_Tri_profiling.stage('pessimistic_sorting', actions=len(ACTIONS)):
+        Outranking = _symbols_to_outranking(ACTIONS, OVER_RANKING)
+        _check_categories(CATEGORIES, len(Outranking['(ai,bk)']))
+        Category = pessimistic_assignment(Outranking)
+        return sorting_views(ACTIONS, Category, CATEGORIES)
 
 
 def optimistic_sorting(ACTIONS, OVER_RANKING, CATEGORIES):
     """
-    Ranks actions in the three different categories according to a optimistic procedure.
+    Ranks actions in the different categories according to a optimistic procedure.
 
     :param ACTIONS: List containing the names of the actions as strings.
 
-    :param OVER_RANKING: Dictionary containing the over ranking relations.
+    :param OVER_RANKING: Dictionary containing the over ranking relations, with the
+        profiles given from the lowest to the highest between 'Floor' and 'Roof'.
 
-    :param CATEGORIES: List containing the names of the three different categories.
+    :param CATEGORIES: List containing the names of the different categories, from
+        the worst to the best.
 
-    :return: ranking: Dictionary containing the rank of each actions according to a
-        optimistic procedure. The keys are the actions and the values are the median ranks.
+    :return: ranking: Dictionary view containing the different categories and the
+        actions they contain. The keys are the categories, for instance 'Bad', 'Moderate',
+        and 'Good'. The values are arrays containing the actions.
 
-    :return: category: Dictionary containing the three different categories and the actions
-        they contain. The keys are the categories 'Bad', 'Moderate', and 'Good'. The values
-        are lists containing the actions.
+    :return: category: Dictionary view containing the category of each action according
+        to a optimistic procedure. The keys are the actions and the values are the numbers
+        of the categories, from 1 (worst) to the number of categories (best). The compact
+        array of category numbers is available as `category.values`.
     """
-    ranking = {}
-    category = {}
-    for cat in CATEGORIES:
-        ranking[cat] = np.array([])
-    for i in range(len(ACTIONS)):
-        if OVER_RANKING['Moderate'][i] == '<' or OVER_RANKING['Moderate'][i] == 'R':
-            ranking['Bad'] = np.append(ranking['Bad'], ACTIONS[i])
-            category[ACTIONS[i]] = 1
-        elif OVER_RANKING['Good'][i] == '<' or OVER_RANKING['Good'][i] == 'R':
-            ranking['Moderate'] = np.append(ranking['Moderate'], ACTIONS[i])
-            category[ACTIONS[i]] = 2
-        elif OVER_RANKING['Roof'][i] == '<' or OVER_RANKING['Roof'][i] == 'R':
-            ranking['Good'] = np.append(ranking['Good'], ACTIONS[i])
-            category[ACTIONS[i]] = 3
-    return ranking, category
+    with ELECTRE_Tri_profiling.stage('optimistic_sorting', actions=len(ACTIONS)):
+        Outranking = _symbols_to_outranking(ACTIONS, OVER_RANKING)
+        _check_categories(CATEGORIES, len(Outranking['(ai,bk)']))
+        Category = optimistic_assignment(Outranking)
+        return sorting_views(ACTIONS, Category, CATEGORIES)
 
 
 def median_rank(ACTIONS, PESSIMISTIC_SORTING, OPTIMISTIC_SORTING):
@@ -412,13 +982,13 @@ def median_rank(ACTIONS, PESSIMISTIC_SORTING, OPTIMISTIC_SORTING):
     :param OPTIMISTIC_SORTING: Dictionary containing the actions classified according to
         the optimistic procedure.
 
-    :return med_rank: Dictionary containing the median rank of each action. The keys are the
-        names of the actions and the values are the median ranks.
+    :return med_rank: Dictionary view containing the median rank of each action. The keys
+        are the names of the actions and the values are the median ranks.
     """
-    med_rank = {}
-    for action in ACTIONS:
-        med_rank[action] = (OPTIMISTIC_SORTING[1][action] + PESSIMISTIC_SORTING[1][action]) / 2
-    return med_rank
+    with ELECTRE_Tri_profiling.stage('median_rank', actions=len(ACTIONS)):
+        Pessimistic = _action_values(ACTIONS, PESSIMISTIC_SORTING[1])
+        Optimistic = _action_values(ACTIONS, OPTIMISTIC_SORTING[1])
+        return ActionValues(ACTIONS, (Optimistic + Pessimistic) / 2)
 
 
 def display_results(ACTIONS, PESSIMISTIC_SORTING, OPTIMISTIC_SORTING, MEDIAN_RANK):
@@ -435,7 +1005,9 @@ def display_results(ACTIONS, PESSIMISTIC_SORTING, OPTIMISTIC_SORTING, MEDIAN_RAN
 
     :param MEDIAN_RANK: Dictionary containing the median rank of each action.
     """
-    for action in ACTIONS:
-        MEDIAN_RANK[action] = (OPTIMISTIC_SORTING[1][action] + PESSIMISTIC_SORTING[1][action]) / 2
-        print(action + ' is classified in the category C' + str(OPTIMISTIC_SORTING[1][action]) +
-              str(PESSIMISTIC_SORTING[1][action]) + ' with a median rank of ' + str(MEDIAN_RANK[action]))
+    Pessimistic = _action_values(ACTIONS, PESSIMISTIC_SORTING[1]).tolist()
+    Optimistic = _action_values(ACTIONS, OPTIMISTIC_SORTING[1]).tolist()
+    Median = _action_values(ACTIONS, MEDIAN_RANK).tolist()
+    for action, opt, pes, med in zip(ACTIONS, Optimistic, Pessimistic, Median):
+        print(action + ' is classified in the category C' + str(opt) +
+              str(pes) + ' with a median rank of ' + str(med))
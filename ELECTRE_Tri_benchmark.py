@@ -0,0 +1,448 @@
+import numpy as np
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import ELECTRE_Tri
+import ELECTRE_Tri_incremental
+import ELECTRE_Tri_io
+import ELECTRE_Tri_sensitivity
+
+
+def generate_problem(N_ACTIONS, N_CRITERIA, N_PROFILES=2, SEED=0):
+    """
+    Generates a random sorting problem. The performances are drawn uniformly between 0
+    and 100, the reference profiles are evenly spaced quantiles of each criterion and the
+    indifference, preference and veto thresholds are 2 %, 5 % and 20 % of the range.
+
+    :param N_ACTIONS: Number of actions.
+
+    :param N_CRITERIA: Number of criteria.
+
+    :param N_PROFILES: Number of reference profiles.
+
+    :param SEED: Seed of the random generator.
+
+    :return C: List of strings corresponding to the names of the criteria.
+
+    :return W: Array of shape (criteria,) containing the weightings.
+
+    :return A: List of strings corresponding to the names of the actions.
+
+    :return G: Array of shape (actions, criteria) containing the performances.
+
+    :return B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+    """
+    RNG = np.random.default_rng(SEED)
+    C = ['g' + str(j + 1) for j in range(N_CRITERIA)]
+    A = ['S' + str(i + 1) for i in range(N_ACTIONS)]
+    W = RNG.uniform(1, 10, N_CRITERIA)
+    G = RNG.uniform(0, 100, (N_ACTIONS, N_CRITERIA))
+    B = np.empty((N_PROFILES, N_CRITERIA, 4))
+    B[:, :, 0] = (100 * np.arange(1, N_PROFILES + 1) / (N_PROFILES + 1))[:, np.newaxis]
+    B[:, :, 1:] = [2, 5, 20]
+    return C, W, A, G, B
+
+
+def write_problem_csv(directory, C, W, A, G, B):
+    """
+    Writes a problem as csv files with the structure expected by the input functions of
+    ELECTRE_Tri, one threshold file per profile.
+
+    :return: Names of the criteria file, of the performance file and the list of the
+        names of the threshold files.
+    """
+    CRIT = os.path.join(directory, 'CRIT.csv')
+    PERF = os.path.join(directory, 'PERF.csv')
+    THR = [os.path.join(directory, 'THR' + str(k + 1) + '.csv') for k in range(len(B))]
+    with open(CRIT, 'w') as C_csv:
+        C_csv.write(','.join(C) + '\n' + ','.join(repr(w) for w in np.asarray(W).tolist()) + '\n')
+    with open(PERF, 'w') as P_csv:
+        P_csv.write(','.join(A) + '\n' + ','.join(C) + '\n')
+        np.savetxt(P_csv, G, delimiter=',', fmt='%.17g')
+    for name, B_profile in zip(THR, B):
+        with open(name, 'w') as T_csv:
+            T_csv.write(','.join(C) + '\n')
+            np.savetxt(T_csv, B_profile, delimiter=',', fmt='%.17g')
+    return CRIT, PERF, THR
+
+
+def _measure(FUNCTION, REPEAT, MEMORY):
+    """
+    Best wall time over REPEAT calls of FUNCTION and, if MEMORY, the peak of the memory
+    allocated during one more call traced with tracemalloc.
+    """
+    Seconds = np.inf
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        FUNCTION()
+        Seconds = min(Seconds, time.perf_counter() - start)
+    Peak = None
+    if MEMORY:
+        tracemalloc.start()
+        FUNCTION()
+        Peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return Seconds, Peak
+
+
+def _chunked(FUNCTION, G, B, CHUNK_SIZE=4096):
+    """
+    Calls a tensor function on every chunk of CHUNK_SIZE actions of G, as
+    credibility_pipeline does, so that all the actions are timed while the memory stays
+    that of one chunk.
+    """
+    for start in range(0, len(G), CHUNK_SIZE):
+        FUNCTION(G[start:start + CHUNK_SIZE], B)
+
+
+def benchmark_problem(N_ACTIONS, N_CRITERIA, N_PROFILES=2, SEED=0, REPEAT=3, MEMORY=True,
+                      DICT_LIMIT=100000, LOAD_LIMIT=1000000, LAMBDA=0.75):
+    """
+    Times every stage of the pipeline on a generated problem.
+
+    The stages working on dictionaries of Python floats (input_*, concordance,
+    discordance, global_concordance, credibility, over_ranking_relations and the sorting
+    procedures) are skipped when the problem has more than DICT_LIMIT actions, and the
+    problem is only written to csv files to time the loaders up to LOAD_LIMIT actions.
+
+    :param N_ACTIONS: Number of actions.
+
+    :param N_CRITERIA: Number of criteria.
+
+    :param N_PROFILES: Number of reference profiles.
+
+    :param SEED: Seed of the random generator.
+
+    :param REPEAT: Number of timed calls of each stage, the best one being kept.
+
+    :param MEMORY: Whether to measure the peak memory of each stage.
+
+    :param DICT_LIMIT: Largest number of actions for which the dictionary stages run.
+
+    :param LOAD_LIMIT: Largest number of actions for which the loaders are timed.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :return Results: List of dictionaries with the keys 'actions', 'criteria', 'profiles',
+        'stage', 'seconds' and 'peak_bytes'.
+    """
+    C, W, A, G, B = generate_problem(N_ACTIONS, N_CRITERIA, N_PROFILES, SEED)
+    Profiles = ['b' + str(k + 1) for k in range(N_PROFILES)]
+    Categories = ['C' + str(h + 1) for h in range(N_PROFILES + 1)]
+    Stages = []
+    with tempfile.TemporaryDirectory() as directory:
+        if N_ACTIONS <= LOAD_LIMIT:
+            CRIT, PERF, THR = write_problem_csv(directory, C, W, A, G, B)
+            Stages.append(('load_problem', lambda: ELECTRE_Tri_io.load_problem(CRIT, PERF, THR)))
+        if N_ACTIONS <= min(DICT_LIMIT, LOAD_LIMIT):
+            _, Weights = ELECTRE_Tri.input_criteria(CRIT)
+            _, Performances = ELECTRE_Tri.input_performances(PERF)
+            Thresholds = ELECTRE_Tri.input_profiles(Profiles, THR)
+            Concordance = [ELECTRE_Tri.concordance(C, A, Performances, Thresholds, p) for p in Profiles]
+            Discordance = [ELECTRE_Tri.discordance(C, A, Performances, Thresholds, p) for p in Profiles]
+            Global = [ELECTRE_Tri.global_concordance(c, C, A, Weights) for c in Concordance]
+            Credibility = {key: np.array([ELECTRE_Tri.credibility(g, d, C, A)[key]
+                                          for g, d in zip(Global, Discordance)])
+                           for key in ('(ai,bk)', '(bk,ai)')}
+            Over_ranking = ELECTRE_Tri.over_ranking_symbols(Credibility, Profiles, LAMBDA)
+            Stages += [
+                ('input_criteria', lambda: ELECTRE_Tri.input_criteria(CRIT)),
+                ('input_performances', lambda: ELECTRE_Tri.input_performances(PERF)),
+                ('input_profiles', lambda: ELECTRE_Tri.input_profiles(Profiles, THR)),
+                ('concordance', lambda: [ELECTRE_Tri.concordance(C, A, Performances, Thresholds, p)
+                                         for p in Profiles]),
+                ('discordance', lambda: [ELECTRE_Tri.discordance(C, A, Performances, Thresholds, p)
+                                         for p in Profiles]),
+                ('global_concordance', lambda: [ELECTRE_Tri.global_concordance(c, C, A, Weights)
+                                                for c in Concordance]),
+                ('credibility', lambda: [ELECTRE_Tri.credibility(g, d, C, A)
+                                         for g, d in zip(Global, Discordance)]),
+                ('over_ranking_symbols', lambda: ELECTRE_Tri.over_ranking_symbols(Credibility, Profiles, LAMBDA)),
+                ('pessimistic_sorting', lambda: ELECTRE_Tri.pessimistic_sorting(A, Over_ranking, Categories)),
+                ('optimistic_sorting', lambda: ELECTRE_Tri.optimistic_sorting(A, Over_ranking, Categories)),
+            ]
+        Pipeline = ELECTRE_Tri.credibility_pipeline(G, B, W)
+        Outranking = ELECTRE_Tri.outranking(Pipeline, LAMBDA)
+        Stages += [
+            ('concordance_tensor', lambda: _chunked(ELECTRE_Tri.concordance_tensor, G, B)),
+            ('discordance_tensor', lambda: _chunked(ELECTRE_Tri.discordance_tensor, G, B)),
+            ('credibility_pipeline', lambda: ELECTRE_Tri.credibility_pipeline(G, B, W)),
+            ('outranking', lambda: ELECTRE_Tri.outranking(Pipeline, LAMBDA)),
+            ('pessimistic_assignment', lambda: ELECTRE_Tri.pessimistic_assignment(Outranking)),
+            ('optimistic_assignment', lambda: ELECTRE_Tri.optimistic_assignment(Outranking)),
+        ]
+        Results = []
+        for stage, FUNCTION in Stages:
+            Seconds, Peak = _measure(FUNCTION, REPEAT, MEMORY)
+            Results.append({'actions': N_ACTIONS, 'criteria': N_CRITERIA, 'profiles': N_PROFILES,
+                            'stage': stage, 'seconds': Seconds, 'peak_bytes': Peak})
+    return Results
+
+
+def _reference_credibility(CRITERIA, ACTIONS, PERFORMANCES, THRESHOLDS, WEIGHTS, PROFILE):
+    """
+    Straightforward loop implementation of the credibility of the actions with one
+    profile, following the definitions of the method term by term.
+    """
+    weights_sum = sum(WEIGHTS.values())
+    Concordance = {'(ai,bk)': [], '(bk,ai)': []}
+    Discordance = {'(ai,bk)': [], '(bk,ai)': []}
+    Credibility = {'(ai,bk)': [], '(bk,ai)': []}
+    for action in ACTIONS:
+        c1, c2, d1, d2 = [], [], [], []
+        for criteria in CRITERIA:
+            gbk, qbk, pbk, vbk = THRESHOLDS[PROFILE][criteria]
+            gai = PERFORMANCES[action][criteria]
+            c1.append(min(1, max(0, (gai - gbk + pbk) / (pbk - qbk))))
+            c2.append(min(1, max(0, (gbk - gai + pbk) / (pbk - qbk))))
+            d1.append(min(1, max(0, (gbk - gai - pbk) / (vbk - pbk))))
+            d2.append(min(1, max(0, (gai - gbk - pbk) / (vbk - pbk))))
+        for key, c, d in (('(ai,bk)', c1, d1), ('(bk,ai)', c2, d2)):
+            gc = 0.0
+            for j, criteria in enumerate(CRITERIA):
+                gc = gc + (WEIGHTS[criteria] * c[j]) / weights_sum
+            cr = 1
+            for dj in d:
+                if dj > gc:
+                    cr = cr * (1 - dj) / (1 - gc)
+            Concordance[key].append(c)
+            Discordance[key].append(d)
+            Credibility[key].append(cr * gc)
+    return Concordance, Discordance, Credibility
+
+
+def check_equivalence(CRIT='Building_retrofit_scenarios_CRIT.csv', PERF='Building_retrofit_scenarios_PERF.csv',
+                      THR=('Building_retrofit_scenarios_THRM.csv', 'Building_retrofit_scenarios_THRG.csv'),
+                      PROFILES=('Moderate', 'Good'), LAMBDA=0.75, TOLERANCE=1e-12):
+    """
+    Checks that the vectorised functions and the fused pipeline give the same results
+    as a term by term loop implementation of the method on a dataset, by default the
+    bundled building retrofit example.
+
+    :return Differences: Dictionary giving, for each compared quantity, the largest
+        absolute difference found. An AssertionError is raised when one exceeds
+        TOLERANCE or when an assignment differs.
+    """
+    C, W = ELECTRE_Tri.input_criteria(CRIT)
+    A, P = ELECTRE_Tri.input_performances(PERF)
+    T = ELECTRE_Tri.input_profiles(list(PROFILES), list(THR))
+    G = ELECTRE_Tri.performance_matrix(C, A, P)
+    B = ELECTRE_Tri.profile_array(C, T, list(PROFILES))
+    Pipeline = ELECTRE_Tri.credibility_pipeline(G, B, ELECTRE_Tri.weight_vector(C, W))
+    Concordance = ELECTRE_Tri.concordance_tensor(G, B)
+    Discordance = ELECTRE_Tri.discordance_tensor(G, B)
+    Differences = {'concordance': 0.0, 'discordance': 0.0, 'credibility': 0.0, 'credibility_pipeline': 0.0}
+    Reference = {'(ai,bk)': [], '(bk,ai)': []}
+    for k, profile in enumerate(PROFILES):
+        Conc, Disc, Cred = _reference_credibility(C, A, P, T, W, profile)
+        Wrapped = ELECTRE_Tri.credibility(ELECTRE_Tri.global_concordance(ELECTRE_Tri.concordance(C, A, P, T, profile),
+                                                                         C, A, W),
+                                          ELECTRE_Tri.discordance(C, A, P, T, profile), C, A)
+        for key in Reference:
+            Reference[key].append(Cred[key])
+            Differences['concordance'] = max(Differences['concordance'],
+                                             np.abs(Concordance[key][k] - Conc[key]).max())
+            Differences['discordance'] = max(Differences['discordance'],
+                                             np.abs(Discordance[key][k] - Disc[key]).max())
+            Differences['credibility'] = max(Differences['credibility'],
+                                             np.abs(np.array(Wrapped[key]) - Cred[key]).max())
+            Differences['credibility_pipeline'] = max(Differences['credibility_pipeline'],
+                                                      np.abs(Pipeline[key][k] - Cred[key]).max())
+    for quantity, difference in Differences.items():
+        assert difference <= TOLERANCE, quantity + ' differs by ' + str(difference) + '.'
+    for procedure in ('pessimistic', 'optimistic'):
+        Assign = getattr(ELECTRE_Tri, procedure + '_assignment')
+        Expected = Assign(ELECTRE_Tri.outranking({key: np.array(value) for key, value in Reference.items()}, LAMBDA))
+        assert np.array_equal(Assign(ELECTRE_Tri.outranking(Pipeline, LAMBDA)), Expected), \
+            procedure + ' assignments differ.'
+    return Differences
+
+
+def _assign_both(G, B, W, LAMBDA):
+    """
+    Pessimistic and optimistic categories of the actions, computed by the pipeline.
+    """
+    Outranking = ELECTRE_Tri.outranking(ELECTRE_Tri.credibility_pipeline(G, B, W), LAMBDA)
+    return {'pessimistic': ELECTRE_Tri.pessimistic_assignment(Outranking),
+            'optimistic': ELECTRE_Tri.optimistic_assignment(Outranking)}
+
+
+def check_intervals(G, B, W, LAMBDA, EPSILON=1e-7):
+    """
+    Checks ELECTRE_Tri_sensitivity.weight_intervals and profile_intervals by probing
+    every finite bound: moving the weighting or the profile value of an action's bound
+    slightly inside the interval must keep the category of the action, and slightly
+    outside must change it. The outside probe is skipped for the lower bounds of the
+    weightings at 0 and for the bounds of the profiles clipped at a neighbouring profile,
+    which the parameter cannot cross.
+
+    :param G: Array of shape (actions, criteria) containing the performances.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :param EPSILON: Relative distance of the probes to the bounds.
+
+    :return Probes: Dictionary giving the number of probes of each function. An
+        AssertionError is raised on the first probe giving an unexpected category.
+    """
+    G = np.asarray(G, dtype=float)
+    B = np.asarray(B, dtype=float)
+    W = np.asarray(W, dtype=float)
+    Reference = _assign_both(G, B, W, LAMBDA)
+    Intervals = {'weight_intervals': ELECTRE_Tri_sensitivity.weight_intervals(G, B, W, LAMBDA),
+                 'profile_intervals': ELECTRE_Tri_sensitivity.profile_intervals(G, B, W, LAMBDA)}
+    Probes = {function: 0 for function in Intervals}
+    for function, Bounds in Intervals.items():
+        for procedure, (Lower, Upper) in Bounds.items():
+            for side, Bound in ((-1, Lower), (1, Upper)):
+                for index in np.argwhere(np.isfinite(Bound)):
+                    *parameter, i = index.tolist()
+                    value = Bound[tuple(index)]
+                    if function == 'weight_intervals':
+                        edge = side < 0 and value <= 0
+                    else:
+                        k, j = parameter
+                        Neighbour = k + side
+                        edge = 0 <= Neighbour < len(B) and value == B[Neighbour, j, 0]
+                    step = EPSILON * max(1.0, abs(value))
+                    for shift, same in ((-side * step, True), (side * step, False)):
+                        if edge and not same:
+                            continue
+                        W_probe, B_probe = W.copy(), B.copy()
+                        if function == 'weight_intervals':
+                            W_probe[parameter[0]] = value + shift
+                        else:
+                            B_probe[k, j, 0] = value + shift
+                        Category = _assign_both(G[i:i + 1], B_probe, W_probe, LAMBDA)[procedure][0]
+                        assert (Category == Reference[procedure][i]) == same, \
+                            (function + ' ' + procedure + ': moving the parameter ' + str(tuple(parameter))
+                             + ' of action ' + str(i) + ' to ' + str(float(value + shift)) + ' gives category '
+                             + str(Category) + ', expected ' + ('' if same else 'not ')
+                             + str(Reference[procedure][i]) + '.')
+                        Probes[function] += 1
+    return Probes
+
+
+def check_incremental(N_ACTIONS=500, N_CRITERIA=8, N_PROFILES=3, N_EDITS=300, SEED=0, LAMBDA=0.7,
+                      TOLERANCE=1e-12):
+    """
+    Checks ELECTRE_Tri_incremental.IncrementalModel on a generated problem by applying a
+    seeded random sequence of edits of the performances of one action, of one profile on
+    one criterion and of one weighting. After each edit, the actions reported as
+    changed must be exactly those whose category changed, and every 50 edits and at the
+    end the cached arrays must not drift from a full recomputation by more than
+    TOLERANCE nor give other categories.
+
+    :param N_EDITS: Number of edits.
+
+    :param TOLERANCE: Largest accepted drift of the cached arrays.
+
+    :return Drift: Dictionary giving the largest drift of each cached array over the
+        checkpoints and the number of edits of each kind. An AssertionError is raised
+        when a check fails.
+    """
+    RNG = np.random.default_rng(SEED)
+    C, W, A, G, B = generate_problem(N_ACTIONS, N_CRITERIA, N_PROFILES, SEED)
+    Model = ELECTRE_Tri_incremental.IncrementalModel(G, B, W, LAMBDA)
+    Report = {'concordance': 0.0, 'discordance': 0.0, 'global_concordance': 0.0, 'credibility': 0.0}
+    Edits = {'update_action': 0, 'update_profile': 0, 'update_weight': 0}
+    for edit in range(1, N_EDITS + 1):
+        Before = Model.pessimistic.copy(), Model.optimistic.copy()
+        kind = RNG.choice(list(Edits))
+        if kind == 'update_action':
+            Changed = Model.update_action(RNG.integers(N_ACTIONS), RNG.uniform(0, 100, N_CRITERIA))
+        elif kind == 'update_profile':
+            k, j = RNG.integers(N_PROFILES), RNG.integers(N_CRITERIA)
+            Values = Model.profiles[k, j].copy()
+            Values[0] += RNG.uniform(-2, 2)
+            Changed = Model.update_profile(k, j, Values)
+        else:
+            Changed = Model.update_weight(RNG.integers(N_CRITERIA), RNG.uniform(1, 10))
+        Edits[kind] += 1
+        Expected = np.flatnonzero((Model.pessimistic != Before[0]) | (Model.optimistic != Before[1]))
+        assert np.array_equal(np.sort(Changed), Expected), \
+            kind + ' reported the actions ' + str(np.sort(Changed)) + ' as changed, expected ' + str(Expected) + '.'
+        if edit % 50 == 0 or edit == N_EDITS:
+            Drift = Model.drift()
+            assert Drift.pop('assignments') == 0, 'The categories differ from a full recomputation after ' \
+                + str(edit) + ' edits.'
+            for name, value in Drift.items():
+                assert value <= TOLERANCE, name + ' drifts by ' + str(value) + ' after ' + str(edit) + ' edits.'
+                Report[name] = max(Report[name], value)
+    Report.update(Edits)
+    return Report
+
+
+def _commit():
+    """
+    Hash of the current git commit, or None outside of a git repository.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(ARGS=None):
+    parser = argparse.ArgumentParser(description='Benchmark of the ELECTRE Tri pipeline on generated problems.')
+    parser.add_argument('--actions', type=int, nargs='+', default=[100, 1000, 10000, 100000],
+                        help='numbers of actions of the generated problems')
+    parser.add_argument('--criteria', type=int, nargs='+', default=[5, 20],
+                        help='numbers of criteria of the generated problems')
+    parser.add_argument('--profiles', type=int, default=2, help='number of reference profiles')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random generator')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed calls of each stage')
+    parser.add_argument('--dict-limit', type=int, default=100000,
+                        help='largest number of actions for which the dictionary-based stages run')
+    parser.add_argument('--load-limit', type=int, default=1000000,
+                        help='largest number of actions for which the loaders are timed')
+    parser.add_argument('--no-memory', action='store_true', help='do not measure the peak memory')
+    parser.add_argument('--output', default='bench_output.json', help='name of the JSON file of results')
+    parser.add_argument('--check', action='store_true',
+                        help='only check the vectorised functions against the reference implementation, '
+                             'the sensitivity intervals by probing their bounds, and the incremental updates '
+                             'against a full recomputation')
+    Arguments = parser.parse_args(ARGS)
+
+    if Arguments.check:
+        C, W, A, G, B = ELECTRE_Tri_io.load_problem('Building_retrofit_scenarios_CRIT.csv',
+                                                    'Building_retrofit_scenarios_PERF.csv',
+                                                    ['Building_retrofit_scenarios_THRM.csv',
+                                                     'Building_retrofit_scenarios_THRG.csv'])
+        _, W_generated, _, G_generated, B_generated = generate_problem(60, 6, 3, Arguments.seed)
+        Report = {'equivalence': check_equivalence(),
+                  'intervals': check_intervals(G, B, W, 0.75),
+                  'intervals_generated': check_intervals(G_generated, B_generated, W_generated, 0.65),
+                  'incremental': check_incremental(SEED=Arguments.seed)}
+        print(json.dumps(Report, indent=2))
+        return 0
+    Report = {'commit': _commit(), 'python': platform.python_version(), 'numpy': np.__version__,
+              'seed': Arguments.seed, 'results': []}
+    for n_criteria in Arguments.criteria:
+        for n_actions in Arguments.actions:
+            for Result in benchmark_problem(n_actions, n_criteria, Arguments.profiles, Arguments.seed,
+                                            Arguments.repeat, not Arguments.no_memory, Arguments.dict_limit,
+                                            Arguments.load_limit):
+                print('{actions:>9} actions {criteria:>4} criteria  {stage:<24}{seconds:>12.6f} s'.format(**Result))
+                Report['results'].append(Result)
+    with open(Arguments.output, 'w') as output:
+        json.dump(Report, output, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+import numpy as np
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ELECTRE_Tri
+import ELECTRE_Tri_io
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+PROCEDURES = ('pessimistic', 'optimistic', 'both')
+
+
+def run_dataset(DATASET):
+    """
+    Sorts the actions of one dataset and writes the results.
+
+    :param DATASET: Dictionary with the keys 'crit', 'perf', 'profile_files' (from the
+        lowest to the highest profile) and 'output', giving the names of the files, and
+        optionally 'name', 'profiles', 'categories', 'lambda' (0.75 by default) and
+        'procedure' ('pessimistic', 'optimistic' or 'both', the default).
+
+    :return Report: Dictionary giving the name of the dataset, its status ('ok' or
+        'failed'), the number of actions, the number of actions per category for each
+        procedure, the output file, the elapsed seconds and, on failure, the error.
+    """
+    start = time.perf_counter()
+    Report = {'name': DATASET.get('name', DATASET.get('perf')), 'status': 'failed',
+              'output': DATASET.get('output')}
+    try:
+        Procedure = DATASET.get('procedure', 'both')
+        if Procedure not in PROCEDURES:
+            raise ValueError('Unknown procedure ' + repr(Procedure) + '.')
+        C, W, A, G, B = ELECTRE_Tri_io.load_problem(DATASET['crit'], DATASET['perf'], DATASET['profile_files'])
+        Profiles = DATASET.get('profiles') or ['b' + str(k + 1) for k in range(len(B))]
+        Categories = DATASET.get('categories') or ['C' + str(k + 1) for k in range(len(B) + 1)]
+        Profile_set = ELECTRE_Tri.ProfileSet(C, Profiles, Categories, B)
+        Outranking = ELECTRE_Tri.outranking(ELECTRE_Tri.credibility_pipeline(G, Profile_set.values, W),
+                                            DATASET.get('lambda', 0.75))
+        Names = np.array(Categories, dtype=object)
+        Columns = {}
+        Counts = {}
+        Assignments = {}
+        if Procedure in ('pessimistic', 'both'):
+            Assignments['Pessimistic'] = ELECTRE_Tri.pessimistic_assignment(Outranking)
+        if Procedure in ('optimistic', 'both'):
+            Assignments['Optimistic'] = ELECTRE_Tri.optimistic_assignment(Outranking)
+        for key, Category in Assignments.items():
+            Columns[key] = Names[Category - 1]
+            Counts[key] = dict(zip(Categories, np.bincount(Category, minlength=len(Categories) + 1)[1:].tolist()))
+        if Procedure == 'both':
+            Columns['Median rank'] = (Assignments['Pessimistic'] + Assignments['Optimistic']) / 2
+        ELECTRE_Tri_io.write_results(DATASET['output'], A, Columns)
+        Report.update(status='ok', actions=len(A), counts=Counts)
+    except Exception as error:
+        Report['error'] = type(error).__name__ + ': ' + str(error)
+    Report['seconds'] = time.perf_counter() - start
+    return Report
+
+
+def _check_dataset(DATASET, INDEX):
+    """
+    Raises ValueError if a dataset of a manifest is not a dictionary with the keys and
+    value types expected by run_dataset.
+    """
+    where = 'Dataset ' + str(INDEX + 1) + ' of the manifest'
+    if not isinstance(DATASET, dict):
+        raise ValueError(where + ' must be an object, got ' + json.dumps(DATASET) + '.')
+    for key in ('crit', 'perf', 'profile_files'):
+        if key not in DATASET:
+            raise ValueError(where + " has no '" + key + "'.")
+    for key in ('crit', 'perf', 'output', 'name'):
+        if key in DATASET and not isinstance(DATASET[key], str):
+            raise ValueError(where + ": '" + key + "' must be a string.")
+    Files = DATASET['profile_files']
+    if not isinstance(Files, list) or not all(isinstance(profile, str) for profile in Files):
+        raise ValueError(where + ": 'profile_files' must be a list of strings.")
+    if 'lambda' in DATASET and (isinstance(DATASET['lambda'], bool)
+                                or not isinstance(DATASET['lambda'], (int, float))):
+        raise ValueError(where + ": 'lambda' must be a number.")
+    if DATASET.get('procedure', 'both') not in PROCEDURES:
+        raise ValueError(where + ": unknown procedure " + repr(DATASET['procedure']) + ', expected one of '
+                         + ', '.join(PROCEDURES) + '.')
+
+
+def read_manifest(name, OUTPUT_DIR=None, FORMAT='csv'):
+    """
+    Reads a manifest listing many datasets, raising ValueError if it is not a list of
+    datasets as expected by run_dataset.
+
+    :param name: Name of a .json file containing a list of datasets, each of them a
+        dictionary as expected by run_dataset. Relative file names are relative to the
+        directory of the manifest. Datasets without 'output' are written to OUTPUT_DIR
+        under their name.
+
+    :param OUTPUT_DIR: Directory of the results of the datasets without 'output'. The
+        directory of the manifest is used by default.
+
+    :param FORMAT: Extension of the results of the datasets without 'output'.
+
+    :return Datasets: List of dictionaries as expected by run_dataset.
+    """
+    Root = os.path.dirname(os.path.abspath(name))
+    if OUTPUT_DIR is None:
+        OUTPUT_DIR = Root
+    with open(name) as manifest:
+        Datasets = json.load(manifest)
+    if not isinstance(Datasets, list):
+        raise ValueError('A manifest must contain a list of datasets.')
+    for index, Dataset in enumerate(Datasets):
+        _check_dataset(Dataset, index)
+        Dataset.setdefault('name', 'dataset_' + str(index + 1))
+        for key in ('crit', 'perf'):
+            Dataset[key] = os.path.join(Root, Dataset[key])
+        Dataset['profile_files'] = [os.path.join(Root, profile) for profile in Dataset['profile_files']]
+        if 'output' in Dataset:
+            Dataset['output'] = os.path.join(Root, Dataset['output'])
+        else:
+            Dataset['output'] = os.path.join(OUTPUT_DIR, Dataset['name'] + '.' + FORMAT)
+    return Datasets
+
+
+def run_datasets(DATASETS, WORKERS=1, CALLBACK=None):
+    """
+    Runs many datasets, in a pool of processes when WORKERS is larger than 1.
+
+    :param DATASETS: List of dictionaries as expected by run_dataset.
+
+    :param WORKERS: Number of processes.
+
+    :param CALLBACK: Function called with the report of each dataset as soon as it ends.
+
+    :return Reports: List of the reports of the datasets, in the order of DATASETS.
+    """
+    if WORKERS <= 1 or len(DATASETS) <= 1:
+        Reports = []
+        for Dataset in DATASETS:
+            Reports.append(run_dataset(Dataset))
+            if CALLBACK is not None:
+                CALLBACK(Reports[-1])
+        return Reports
+    Reports = []
+    with ProcessPoolExecutor(min(WORKERS, len(DATASETS))) as executor:
+        for Report in executor.map(run_dataset, DATASETS):
+            Reports.append(Report)
+            if CALLBACK is not None:
+                CALLBACK(Report)
+    return Reports
+
+
+def summary(REPORTS, SECONDS):
+    """
+    Summary report of a run.
+
+    :param REPORTS: List of the reports of the datasets.
+
+    :param SECONDS: Elapsed seconds of the whole run.
+
+    :return Summary: Dictionary giving the numbers of datasets, of failed datasets and
+        of sorted actions, the elapsed seconds and the reports of the datasets.
+    """
+    Failed = [Report['name'] for Report in REPORTS if Report['status'] != 'ok']
+    return {'datasets': len(REPORTS), 'failed': len(Failed), 'failed_datasets': Failed,
+            'actions': sum(Report.get('actions', 0) for Report in REPORTS),
+            'seconds': SECONDS, 'reports': REPORTS}
+
+
+def main(ARGS=None):
+    parser = argparse.ArgumentParser(description='Sorting of actions with the ELECTRE Tri method.')
+    parser.add_argument('--crit', help='file of the criteria and weightings')
+    parser.add_argument('--perf', help='file of the performances of the actions')
+    parser.add_argument('--profile', nargs='+', dest='profile_files',
+                        help='files of the reference profiles, from the lowest to the highest')
+    parser.add_argument('--profiles', nargs='+', help='names of the reference profiles')
+    parser.add_argument('--categories', nargs='+', help='names of the categories, from the worst to the best')
+    parser.add_argument('--lambda', type=float, default=0.75, dest='cutting_threshold', help='cutting threshold')
+    parser.add_argument('--procedure', choices=PROCEDURES, default='both', help='assignment procedure')
+    parser.add_argument('--output', help='file of the results (.csv, .json or .parquet)')
+    parser.add_argument('--manifest', help='.json file listing many datasets, run instead of a single one')
+    parser.add_argument('--output-dir', help='directory of the results of the manifest datasets without output')
+    parser.add_argument('--format', choices=('csv', 'json', 'parquet'), default='csv',
+                        help='format of the results of the manifest datasets without output')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of processes')
+    parser.add_argument('--report', help='.json file of the summary report')
+    parser.add_argument('--quiet', action='store_true', help='do not print the progress')
+    Arguments = parser.parse_args(ARGS)
+
+    if Arguments.manifest is not None:
+        try:
+            Datasets = read_manifest(Arguments.manifest, Arguments.output_dir, Arguments.format)
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            parser.exit(EXIT_USAGE, parser.prog + ': error: invalid manifest: ' + str(error) + '\n')
+        for Dataset in Datasets:
+            Dataset.setdefault('lambda', Arguments.cutting_threshold)
+            Dataset.setdefault('procedure', Arguments.procedure)
+            Dataset.setdefault('profiles', Arguments.profiles)
+            Dataset.setdefault('categories', Arguments.categories)
+    else:
+        if None in (Arguments.crit, Arguments.perf, Arguments.profile_files, Arguments.output):
+            parser.error('--crit, --perf, --profile and --output are required without --manifest')
+        Datasets = [{'name': Arguments.perf, 'crit': Arguments.crit, 'perf': Arguments.perf,
+                     'profile_files': Arguments.profile_files, 'profiles': Arguments.profiles,
+                     'categories': Arguments.categories, 'lambda': Arguments.cutting_threshold,
+                     'procedure': Arguments.procedure, 'output': Arguments.output}]
+    if Arguments.output_dir is not None:
+        os.makedirs(Arguments.output_dir, exist_ok=True)
+
+    def progress(REPORT):
+        if not Arguments.quiet:
+            if REPORT['status'] == 'ok':
+                print('{name}: {actions} actions in {seconds:.3f} s -> {output}'.format(**REPORT))
+            else:
+                print('{name}: failed, {error}'.format(**REPORT), file=sys.stderr)
+
+    start = time.perf_counter()
+    Summary = summary(run_datasets(Datasets, Arguments.workers, progress), time.perf_counter() - start)
+    if Arguments.report is not None:
+        with open(Arguments.report, 'w') as report:
+            json.dump(Summary, report, indent=2)
+    if not Arguments.quiet:
+        print('{datasets} datasets, {failed} failed, {actions} actions in {seconds:.3f} s'.format(**Summary))
+    return EXIT_FAILED if Summary['failed'] else EXIT_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
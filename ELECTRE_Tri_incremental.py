@@ -0,0 +1,185 @@
+import numpy as np
+
+import ELECTRE_Tri
+
+
+class IncrementalModel:
+    """
+    Stateful evaluator of a sorting problem that keeps the partial concordance and
+    discordance arrays, the global concordances and the credibilities in memory, so
+    that editing the performances of one action or the thresholds of one profile on one
+    criterion only recomputes the affected row or column and re-assigns only the actions
+    whose outranking relations changed.
+
+    Profile and weighting edits update the global concordance by difference. Rounding
+    errors of the order of the machine precision may therefore accumulate over many
+    edits: drift measures them and refresh recomputes every array from scratch. The
+    performances are kept in column-major order so that the column of one criterion is
+    contiguous.
+
+    :param G: Array of shape (actions, criteria) containing the performances.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :param LAMBDA: Cutting threshold value.
+    """
+
+    def __init__(self, G, B, W, LAMBDA):
+        self.performances = np.array(G, dtype=float, order='F')
+        self.profiles = np.array(B, dtype=float)
+        self.weights = np.array(W, dtype=float)
+        self.cutting_threshold = LAMBDA
+        self.refresh()
+
+    def refresh(self):
+        """
+        Recomputes all the cached arrays and the assignments from the current data.
+        """
+        self.concordance = ELECTRE_Tri.concordance_tensor(self.performances, self.profiles)
+        self.discordance = ELECTRE_Tri.discordance_tensor(self.performances, self.profiles)
+        self.global_concordance = ELECTRE_Tri.global_concordance_tensor(self.concordance, self.weights)
+        self.credibility = ELECTRE_Tri.credibility_tensor(self.global_concordance, self.discordance)
+        self.outranking = ELECTRE_Tri.outranking(self.credibility, self.cutting_threshold)
+        self.pessimistic = ELECTRE_Tri.pessimistic_assignment(self.outranking)
+        self.optimistic = ELECTRE_Tri.optimistic_assignment(self.outranking)
+
+    def drift(self):
+        """
+        Compares the cached arrays with arrays recomputed from scratch from the current
+        data, without changing them, to measure the rounding errors accumulated by the
+        edits and decide when to refresh.
+
+        :return Drift: Dictionary giving the largest absolute difference of the partial
+            concordances, partial discordances, global concordances and credibilities,
+            and the number of actions whose pessimistic or optimistic category differs
+            ('assignments').
+        """
+        Fresh = {'concordance': ELECTRE_Tri.concordance_tensor(self.performances, self.profiles),
+                 'discordance': ELECTRE_Tri.discordance_tensor(self.performances, self.profiles)}
+        Fresh['global_concordance'] = ELECTRE_Tri.global_concordance_tensor(Fresh['concordance'], self.weights)
+        Fresh['credibility'] = ELECTRE_Tri.credibility_tensor(Fresh['global_concordance'], Fresh['discordance'])
+        Drift = {name: max(float(np.abs(Arrays[key] - getattr(self, name)[key]).max(initial=0.0))
+                           for key in Arrays)
+                 for name, Arrays in Fresh.items()}
+        Outranking = ELECTRE_Tri.outranking(Fresh['credibility'], self.cutting_threshold)
+        Drift['assignments'] = int(np.count_nonzero(
+            (ELECTRE_Tri.pessimistic_assignment(Outranking) != self.pessimistic)
+            | (ELECTRE_Tri.optimistic_assignment(Outranking) != self.optimistic)))
+        return Drift
+
+    def _reassign(self, ACTIONS):
+        """
+        Re-assigns the actions of index ACTIONS and returns those whose pessimistic or
+        optimistic category changed.
+        """
+        Outranking = {'(ai,bk)': self.outranking['(ai,bk)'][:, ACTIONS]}
+        Pessimistic = ELECTRE_Tri.pessimistic_assignment(Outranking)
+        Optimistic = ELECTRE_Tri.optimistic_assignment(Outranking)
+        Changed = (Pessimistic != self.pessimistic[ACTIONS]) | (Optimistic != self.optimistic[ACTIONS])
+        self.pessimistic[ACTIONS] = Pessimistic
+        self.optimistic[ACTIONS] = Optimistic
+        return ACTIONS[Changed]
+
+    def _update_credibility(self, key, k, ACTIONS):
+        """
+        Recomputes the credibility with the profile k of the actions of index ACTIONS
+        after their global concordance or discordance changed, and returns those whose
+        outranking relation changed.
+        """
+        Credibility = ELECTRE_Tri._credibility_kernel(self.global_concordance[key][k, ACTIONS],
+                                                      self.discordance[key][k, ACTIONS], np.empty(len(ACTIONS)))
+        self.credibility[key][k, ACTIONS] = Credibility
+        Outranking = Credibility >= self.cutting_threshold
+        Changed = ACTIONS[Outranking != self.outranking[key][k, ACTIONS]]
+        self.outranking[key][k, ACTIONS] = Outranking
+        return Changed
+
+    def update_action(self, i, PERFORMANCE):
+        """
+        Changes the performances of one action.
+
+        :param i: Index of the action.
+
+        :param PERFORMANCE: Array of shape (criteria,) containing the new performances.
+
+        :return Changed: Array containing the indices of the actions whose category
+            changed, that is i or nothing.
+        """
+        self.performances[i] = PERFORMANCE
+        Concordance = ELECTRE_Tri.concordance_tensor(self.performances[i:i + 1], self.profiles)
+        Discordance = ELECTRE_Tri.discordance_tensor(self.performances[i:i + 1], self.profiles)
+        W = self.weights / self.weights.sum()
+        for key in self.concordance:
+            C = Concordance[key][:, 0]
+            D = Discordance[key][:, 0]
+            GC = C @ W
+            self.concordance[key][:, i] = C
+            self.discordance[key][:, i] = D
+            self.global_concordance[key][:, i] = GC
+            self.credibility[key][:, i] = ELECTRE_Tri._credibility_kernel(GC, D, np.empty(len(GC)))
+            self.outranking[key][:, i] = self.credibility[key][:, i] >= self.cutting_threshold
+        return self._reassign(np.array([i]))
+
+    def update_profile(self, k, j, VALUES):
+        """
+        Changes the reference profile and the thresholds of one profile on one criterion.
+        The partial indices of an action only depend on the profile when its performance
+        lies within bk - vk and bk + vk, so that only the actions lying within these
+        bounds for the old or for the new profile are re-evaluated.
+
+        :param k: Index of the profile.
+
+        :param j: Index of the criterion.
+
+        :param VALUES: New values of bk, qk, pk and vk.
+
+        :return Changed: Array containing the indices of the actions whose category
+            changed.
+        """
+        Old = self.profiles[k, j].copy()
+        self.profiles[k, j] = VALUES
+        New = self.profiles[k, j]
+        Lower = min(Old[0] - Old[1:].max(), New[0] - New[1:].max())
+        Upper = max(Old[0] + Old[1:].max(), New[0] + New[1:].max())
+        Column = self.performances[:, j]
+        Touched = np.flatnonzero((Column >= Lower) & (Column <= Upper))
+        Concordance = ELECTRE_Tri.concordance_tensor(Column[Touched, np.newaxis], self.profiles[k:k + 1, j:j + 1])
+        Discordance = ELECTRE_Tri.discordance_tensor(Column[Touched, np.newaxis], self.profiles[k:k + 1, j:j + 1])
+        w = self.weights[j] / self.weights.sum()
+        Changed = []
+        for key in self.concordance:
+            C = Concordance[key][0, :, 0]
+            self.global_concordance[key][k, Touched] += w * (C - self.concordance[key][k, Touched, j])
+            self.concordance[key][k, Touched, j] = C
+            self.discordance[key][k, Touched, j] = Discordance[key][0, :, 0]
+            Changed.append(self._update_credibility(key, k, Touched))
+        return self._reassign(np.unique(np.concatenate(Changed)))
+
+    def update_weight(self, j, WEIGHT):
+        """
+        Changes the weighting of one criterion.
+
+        :param j: Index of the criterion.
+
+        :param WEIGHT: New weighting.
+
+        :return Changed: Array containing the indices of the actions whose category
+            changed.
+        """
+        Old_sum = self.weights.sum()
+        Difference = WEIGHT - self.weights[j]
+        self.weights[j] = WEIGHT
+        New_sum = self.weights.sum()
+        Actions = np.arange(len(self.performances))
+        Changed = []
+        for key in self.concordance:
+            GC = self.global_concordance[key]
+            GC *= Old_sum
+            GC += Difference * self.concordance[key][:, :, j]
+            GC /= New_sum
+            for k in range(len(self.profiles)):
+                Changed.append(self._update_credibility(key, k, Actions))
+        return self._reassign(np.unique(np.concatenate(Changed)))
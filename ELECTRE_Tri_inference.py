@@ -0,0 +1,314 @@
+import numpy as np
+
+import ELECTRE_Tri
+import ELECTRE_Tri_incremental
+import ELECTRE_Tri_sensitivity
+
+
+def _correct_intervals(BREAKPOINTS, LABELS):
+    """
+    Bounds of the intervals (lower, upper] of cutting thresholds for which each action is
+    assigned to its labelled category: the breakpoints are non-increasing over the
+    profiles and the action is assigned to Ch as long as LAMBDA does not exceed the
+    breakpoint of bh-1 and exceeds the breakpoint of bh.
+    """
+    K, n = BREAKPOINTS.shape
+    Bounds = np.vstack((np.full((1, n), np.inf), BREAKPOINTS, np.full((1, n), -np.inf)))
+    Actions = np.arange(n)
+    return Bounds[LABELS, Actions], Bounds[LABELS - 1, Actions]
+
+
+def best_lambda(CREDIBILITY, LABELS, PROCEDURE='pessimistic', LOWER=0.5, UPPER=1.0):
+    """
+    Cutting threshold assigning the largest number of actions to their labelled category,
+    found exactly from the breakpoints of ELECTRE_Tri_sensitivity.lambda_breakpoints:
+    the number of correct assignments only changes at the breakpoints, so that it is
+    enough to evaluate it at each of them with a sweep over the sorted interval bounds.
+    The threshold returned is the middle of the best interval.
+
+    :param CREDIBILITY: Dictionary containing the credibility arrays of shape
+        (profiles, actions), as returned by ELECTRE_Tri.credibility_pipeline.
+
+    :param LABELS: Array of shape (actions,) containing the labelled category numbers,
+        from 1 (worst) to profiles + 1 (best).
+
+    :param PROCEDURE: 'pessimistic' or 'optimistic'.
+
+    :param LOWER: Lowest cutting threshold allowed.
+
+    :param UPPER: Highest cutting threshold allowed.
+
+    :return LAMBDA: Best cutting threshold.
+
+    :return correct: Number of actions assigned to their labelled category with it.
+    """
+    Lower, Upper = _correct_intervals(ELECTRE_Tri_sensitivity.lambda_breakpoints(CREDIBILITY)[PROCEDURE],
+                                      np.asarray(LABELS))
+    Upper = np.minimum(Upper, UPPER)
+    Valid = (Lower < Upper) & (Upper >= LOWER)
+    Lower, Upper = np.sort(Lower[Valid]), np.sort(Upper[Valid])
+    Candidates = np.append(Upper, UPPER)
+    Count = (len(Upper) - np.searchsorted(Upper, Candidates, side='left')
+             - (len(Lower) - np.searchsorted(Lower, Candidates, side='left')))
+    best = np.argmax(Count)
+    Endpoints = np.concatenate((Lower, Upper, [LOWER]))
+    Below = Endpoints[Endpoints < Candidates[best]]
+    lower = Below.max() if len(Below) else LOWER
+    return float((max(lower, LOWER) + Candidates[best]) / 2), int(Count[best])
+
+
+class ParameterEvaluator:
+    """
+    Batched evaluator of many candidate weightings and cutting thresholds on the same
+    actions and reference profiles. The partial concordance and discordance arrays of the
+    actions with the profiles are computed once, so that each candidate only costs a
+    matrix product and the discordance veto.
+
+    :param G: Array of shape (actions, criteria) containing the performances.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :param MEMORY: Number of bytes of the temporaries of one batch of candidates.
+    """
+
+    def __init__(self, G, B, MEMORY=1 << 26):
+        self.concordance = ELECTRE_Tri.concordance_tensor(G, B)['(ai,bk)']
+        self.discordance = ELECTRE_Tri.discordance_tensor(G, B)['(ai,bk)']
+        self.batch = max(1, MEMORY // (8 * self.concordance.size))
+
+    def credibility(self, WS):
+        """
+        Credibilities of the actions over the profiles for each candidate weighting.
+
+        :param WS: Array of shape (candidates, criteria) of weightings.
+
+        :return Credibility: Array of shape (candidates, profiles, actions).
+        """
+        WS = np.atleast_2d(np.asarray(WS, dtype=float))
+        WS = WS / WS.sum(axis=1, keepdims=True)
+        K, n, m = self.concordance.shape
+        Credibility = np.empty((len(WS), K, n))
+        D = self.discordance[:, :, np.newaxis, :]
+        for start in range(0, len(WS), self.batch):
+            Batch = WS[start:start + self.batch]
+            GC = self.concordance @ Batch.T
+            Out = ELECTRE_Tri._credibility_kernel(GC, D, np.empty(GC.shape))
+            Credibility[start:start + len(Batch)] = Out.transpose(2, 0, 1)
+        return Credibility
+
+    def assign(self, WS, LAMBDAS, PROCEDURE='pessimistic'):
+        """
+        Categories of the actions for each candidate weighting and cutting threshold.
+
+        :param WS: Array of shape (candidates, criteria) of weightings.
+
+        :param LAMBDAS: Array of shape (candidates,) of cutting thresholds.
+
+        :param PROCEDURE: 'pessimistic' or 'optimistic'.
+
+        :return Category: Array of shape (candidates, actions) of category numbers.
+        """
+        S = self.credibility(WS) >= np.asarray(LAMBDAS, dtype=float).reshape(-1, 1, 1)
+        if PROCEDURE == 'pessimistic':
+            S = np.concatenate((np.ones_like(S[:, :1]), S), axis=1)
+            Category = S.shape[1] - np.argmax(S[:, ::-1], axis=1)
+        else:
+            Category = np.argmax(np.concatenate((~S, np.ones_like(S[:, :1])), axis=1), axis=1) + 1
+        return Category.astype(ELECTRE_Tri._category_dtype(len(self.concordance)))
+
+    def accuracy(self, WS, LAMBDAS, LABELS, PROCEDURE='pessimistic'):
+        """
+        Share of the actions assigned to their labelled category for each candidate.
+
+        :return Accuracy: Array of shape (candidates,).
+        """
+        return np.mean(self.assign(WS, LAMBDAS, PROCEDURE) == np.asarray(LABELS), axis=1)
+
+
+def infer_weights(G, B, LABELS, LOWER=0.5, UPPER=1.0, MIN_WEIGHT=0.0, MARGIN=1e-3):
+    """
+    Infers the weightings and the cutting threshold from labelled assignments with a
+    linear program solved by HiGHS (scipy.optimize.linprog). The discordance is relaxed:
+    the credibility is replaced by the global concordance, which is linear in the
+    weightings. An action labelled Ch must then outrank bh-1 (global concordance at least
+    LAMBDA) and must not outrank bh (global concordance lower than LAMBDA by a margin),
+    unless a criterion vetoes it; the program minimises the sum of the violations of
+    these constraints, and secondarily maximises the margin. The cutting threshold is
+    then recomputed exactly with the discordance by best_lambda.
+
+    :param G: Array of shape (actions, criteria) containing the performances of the
+        labelled actions.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :param LABELS: Array of shape (actions,) containing the labelled category numbers,
+        from 1 (worst) to profiles + 1 (best), for the pessimistic procedure.
+
+    :param LOWER: Lowest cutting threshold allowed.
+
+    :param UPPER: Highest cutting threshold allowed.
+
+    :param MIN_WEIGHT: Lowest normalised weighting allowed for each criterion.
+
+    :param MARGIN: Weight of the margin in the objective.
+
+    :return W: Array of shape (criteria,) of weightings summing to 1.
+
+    :return LAMBDA: Cutting threshold.
+    """
+    try:
+        from scipy import sparse
+        from scipy.optimize import linprog
+    except ImportError:
+        raise ImportError('scipy is required to infer the weightings.') from None
+    LABELS = np.asarray(LABELS)
+    C = ELECTRE_Tri.concordance_tensor(G, B)['(ai,bk)']
+    K, n, m = C.shape
+    Actions = np.arange(n)
+    # A full veto sets the credibility to 0 whatever the weightings: the action cannot
+    # outrank that profile, so that its constraints with it are dropped.
+    Veto = np.vstack((np.zeros((1, n), dtype=bool),
+                      ELECTRE_Tri.discordance_tensor(G, B)['(ai,bk)'].max(axis=2) >= 1,
+                      np.ones((1, n), dtype=bool)))
+    Outranks = (LABELS > 1) & ~Veto[LABELS - 1, Actions]
+    Below = (LABELS <= K) & ~Veto[LABELS, Actions]
+    # Variables: weightings (m), LAMBDA, margin, then one violation per constraint.
+    C_lower = C[LABELS[Outranks] - 2, Actions[Outranks]]
+    C_upper = C[LABELS[Below] - 1, Actions[Below]]
+    n_lower, n_upper = len(C_lower), len(C_upper)
+    Constraints = np.vstack((np.hstack((-C_lower, np.ones((n_lower, 1)), np.zeros((n_lower, 1)))),
+                             np.hstack((C_upper, -np.ones((n_upper, 1)), np.ones((n_upper, 1))))))
+    A_ub = sparse.hstack((sparse.csr_matrix(Constraints), -sparse.identity(n_lower + n_upper))).tocsr()
+    A_eq = np.concatenate((np.ones(m), np.zeros(2 + n_lower + n_upper)))[np.newaxis]
+    Cost = np.concatenate((np.zeros(m + 1), [-MARGIN], np.ones(n_lower + n_upper)))
+    Bounds = [(MIN_WEIGHT, 1)] * m + [(LOWER, UPPER), (0, 1)] + [(0, None)] * (n_lower + n_upper)
+    Result = linprog(Cost, A_ub=A_ub, b_ub=np.zeros(n_lower + n_upper), A_eq=A_eq, b_eq=[1],
+                     bounds=Bounds, method='highs')
+    if Result.status != 0:
+        raise ValueError('The inference of the weightings failed: ' + Result.message)
+    W = np.maximum(Result.x[:m], 0)
+    W = W / W.sum()
+    Credibility = ELECTRE_Tri.credibility_pipeline(G, B, W)
+    return W, best_lambda(Credibility, LABELS, 'pessimistic', LOWER, UPPER)[0]
+
+
+def infer_profiles(G, B, W, LAMBDA, LABELS, ITERATIONS=2000, STEP=0.1, TEMPERATURE=1.0, SEED=0,
+                   PROCEDURE='pessimistic'):
+    """
+    Infers the reference profiles from labelled assignments by simulated annealing. Each
+    move shifts one profile on one criterion, together with its thresholds, by a normal
+    step proportional to the spread of the performances on that criterion, keeping the
+    profiles ordered. The moves are evaluated with an
+    ELECTRE_Tri_incremental.IncrementalModel, which only re-evaluates the actions lying
+    within the veto thresholds of the moved profile, so that thousands of moves are
+    cheap.
+
+    :param G: Array of shape (actions, criteria) containing the performances of the
+        labelled actions.
+
+    :param B: Array of shape (profiles, criteria, 4) containing the initial profiles and
+        thresholds.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :param LABELS: Array of shape (actions,) containing the labelled category numbers.
+
+    :param ITERATIONS: Number of moves.
+
+    :param STEP: Standard deviation of the moves, relative to the standard deviation of
+        the performances on the criterion.
+
+    :param TEMPERATURE: Initial temperature, in numbers of misassigned actions, decreasing
+        linearly to 0.
+
+    :param SEED: Seed of the random generator.
+
+    :param PROCEDURE: 'pessimistic' or 'optimistic'.
+
+    :return B: Array of shape (profiles, criteria, 4) of the best profiles found.
+
+    :return correct: Number of actions assigned to their labelled category with them.
+    """
+    RNG = np.random.default_rng(SEED)
+    LABELS = np.asarray(LABELS)
+    Model = ELECTRE_Tri_incremental.IncrementalModel(G, B, W, LAMBDA)
+    Assigned = getattr(Model, PROCEDURE)
+    Correct = Assigned == LABELS
+    correct = best = int(Correct.sum())
+    Best = Model.profiles.copy()
+    Scale = STEP * np.std(Model.performances, axis=0)
+    K, m = Model.profiles.shape[:2]
+    for iteration in range(ITERATIONS):
+        k, j = RNG.integers(K), RNG.integers(m)
+        Old = Model.profiles[k, j].copy()
+        value = Old[0] + RNG.normal(0, Scale[j])
+        if k > 0:
+            value = max(value, Model.profiles[k - 1, j, 0])
+        if k < K - 1:
+            value = min(value, Model.profiles[k + 1, j, 0])
+        Changed = Model.update_profile(k, j, np.concatenate(([value], Old[1:])))
+        difference = int(np.count_nonzero(Assigned[Changed] == LABELS[Changed])
+                         - np.count_nonzero(Correct[Changed]))
+        temperature = TEMPERATURE * (1 - iteration / ITERATIONS)
+        if difference >= 0 or (temperature > 0 and RNG.random() < np.exp(difference / temperature)):
+            Correct[Changed] = Assigned[Changed] == LABELS[Changed]
+            correct += difference
+            if correct > best:
+                best = correct
+                Best = Model.profiles.copy()
+        else:
+            Model.update_profile(k, j, Old)
+    return Best, best
+
+
+def fit(G, B, LABELS, ROUNDS=3, ITERATIONS=2000, CANDIDATES=256, SPREAD=0.2, SEED=0, LOWER=0.5, UPPER=1.0):
+    """
+    Fits the weightings, the cutting threshold and the reference profiles to labelled
+    assignments of the pessimistic procedure. Each round infers the weightings and the
+    cutting threshold with infer_weights, refines them with a ParameterEvaluator on a
+    batch of candidates drawn around them, since the linear program ignores the veto,
+    and then moves the profiles with infer_profiles. The best round is kept.
+
+    :param G: Array of shape (actions, criteria) containing the performances of the
+        labelled actions.
+
+    :param B: Array of shape (profiles, criteria, 4) containing the initial profiles and
+        thresholds.
+
+    :param LABELS: Array of shape (actions,) containing the labelled category numbers.
+
+    :param ROUNDS: Number of rounds.
+
+    :param ITERATIONS: Number of moves of the profiles per round.
+
+    :param CANDIDATES: Number of candidate weightings scored per round.
+
+    :param SPREAD: Relative half-width of the perturbation of the candidate weightings.
+
+    :param SEED: Seed of the random generator.
+
+    :return Fitted: Dictionary giving the weightings 'W', the cutting threshold 'LAMBDA',
+        the profiles 'B' and the share of the actions assigned to their labelled category
+        'accuracy'.
+    """
+    RNG = np.random.default_rng(SEED)
+    LABELS = np.asarray(LABELS)
+    B = np.array(B, dtype=float)
+    Fitted = None
+    for _ in range(ROUNDS):
+        W, LAMBDA = infer_weights(G, B, LABELS, LOWER, UPPER)
+        Ws = np.vstack((W, W * RNG.uniform(1 - SPREAD, 1 + SPREAD, (CANDIDATES - 1, len(W)))))
+        Credibility = ParameterEvaluator(G, B).credibility(Ws)
+        Scores = [best_lambda({'(ai,bk)': S}, LABELS, 'pessimistic', LOWER, UPPER) for S in Credibility]
+        best = max(range(len(Ws)), key=lambda s: Scores[s][1])
+        W, LAMBDA = Ws[best] / Ws[best].sum(), Scores[best][0]
+        B = infer_profiles(G, B, W, LAMBDA, LABELS, ITERATIONS, SEED=int(RNG.integers(1 << 31)))[0]
+        Outranking = ELECTRE_Tri.outranking(ELECTRE_Tri.credibility_pipeline(G, B, W), LAMBDA)
+        accuracy = float(np.mean(ELECTRE_Tri.pessimistic_assignment(Outranking) == LABELS))
+        if Fitted is None or accuracy > Fitted['accuracy']:
+            Fitted = {'W': W, 'LAMBDA': LAMBDA, 'B': B.copy(), 'accuracy': accuracy}
+    return Fitted
@@ -0,0 +1,475 @@
+import numpy as np
+import csv
+import json
+import os
+from itertools import islice
+
+import ELECTRE_Tri_profiling
+
+
+def _extension(name):
+    """
+    Lower-case extension of a file name, including the leading dot.
+    """
+    return os.path.splitext(str(name))[1].lower()
+
+
+def _read_table(name):
+    """
+    Reads a Parquet or Feather file into a pandas DataFrame. pandas, and pyarrow for
+    these formats, are only imported when such a file is read.
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError('pandas and pyarrow are required to read ' + str(name) + '.') from None
+    if _extension(name) == '.parquet':
+        return pd.read_parquet(name)
+    return pd.read_feather(name)
+
+
+def _read_header(name, LINES=1):
+    """
+    List of the comma-separated fields of each of the first LINES lines of a .csv file.
+    """
+    with open(name, 'r', newline='') as csv_file:
+        reader = csv.reader(csv_file, delimiter=',')
+        return [next(reader) for _ in range(LINES)]
+
+
+def load_criteria(name):
+    """
+    Loads the criteria and their weightings into an array.
+
+    :param name: Name of the file. A .csv file must have the structure expected by
+        ELECTRE_Tri.input_criteria. A .parquet or .feather file must contain one column
+        per criterion and a single row of weightings.
+
+    :return C: List of strings corresponding to the names of the criteria.
+
+    :return W: Array of shape (criteria,) containing the weightings.
+    """
+    with ELECTRE_Tri_profiling.stage('load_criteria', file=str(name)):
+        if _extension(name) in ('.parquet', '.feather'):
+            Table = _read_table(name)
+            C, W = [str(criteria) for criteria in Table.columns], Table.to_numpy(dtype=np.float64)[0]
+        else:
+            C = _read_header(name)[0]
+            W = np.loadtxt(name, delimiter=',', dtype=np.float64, skiprows=1, ndmin=2)[0]
+        if len(W) != len(C):
+            raise ValueError(str(name) + ' must contain ' + str(len(C)) + ' weightings, got ' + str(len(W)) + '.')
+        return C, W
+
+
+def load_performances(name, CRITERIA=None):
+    """
+    Loads the actions and their performances into an array.
+
+    :param name: Name of the file. A .csv file must have the structure expected by
+        ELECTRE_Tri.input_performances. A .parquet or .feather file must contain a column
+        'Action' with the names of the actions and one column per criterion. A .npz file
+        must contain the arrays 'actions', 'criteria' and 'performances'. A .npy file only
+        contains the array of performances: the actions are then numbered from 1 and the
+        criteria must be given.
+
+    :param CRITERIA: List containing the names of the criteria, only used for .npy files.
+
+    :return A: List of strings corresponding to the names of the actions.
+
+    :return C: List of strings corresponding to the names of the criteria.
+
+    :return G: Array of shape (actions, criteria) containing the performances.
+    """
+    with ELECTRE_Tri_profiling.stage('load_performances', file=str(name)):
+        extension = _extension(name)
+        if extension in ('.parquet', '.feather'):
+            Table = _read_table(name)
+            A = Table.pop('Action').astype(str).tolist()
+            return A, [str(criteria) for criteria in Table.columns], Table.to_numpy(dtype=np.float64)
+        if extension == '.npz':
+            with np.load(name) as Archive:
+                return (Archive['actions'].astype(str).tolist(), Archive['criteria'].astype(str).tolist(),
+                        np.asarray(Archive['performances'], dtype=np.float64))
+        if extension == '.npy':
+            if CRITERIA is None:
+                raise ValueError('The names of the criteria must be given to load ' + str(name) + '.')
+            G = np.load(name, mmap_mode='r')
+            return [str(i + 1) for i in range(len(G))], list(CRITERIA), G
+        A, C = _read_header(name, 2)
+        G = np.loadtxt(name, delimiter=',', dtype=np.float64, skiprows=2, ndmin=2)
+        if G.shape != (len(A), len(C)):
+            raise ValueError(str(name) + ' must contain ' + str(len(A)) + ' rows of ' + str(len(C))
+                             + ' performances, got ' + str(G.shape) + '.')
+        return A, C, G
+
+
+def load_profile(name, CRITERIA=None):
+    """
+    Loads a reference profile and its thresholds into an array.
+
+    :param name: Name of the file. A .csv file must have the structure expected by
+        ELECTRE_Tri.input_profiles. A .parquet or .feather file must contain the columns
+        'Criterion', 'b', 'q', 'p' and 'v' with one row per criterion. A .npy file only
+        contains the array of shape (criteria, 4) and the criteria must be given.
+
+    :param CRITERIA: List containing the names of the criteria, only used for .npy files.
+
+    :return C: List of strings corresponding to the names of the criteria.
+
+    :return B: Array of shape (criteria, 4) containing the values of bk, qk, pk and vk.
+    """
+    with ELECTRE_Tri_profiling.stage('load_profile', file=str(name)):
+        extension = _extension(name)
+        if extension in ('.parquet', '.feather'):
+            Table = _read_table(name)
+            return Table['Criterion'].astype(str).tolist(), Table[['b', 'q', 'p', 'v']].to_numpy(dtype=np.float64)
+        if extension == '.npy':
+            if CRITERIA is None:
+                raise ValueError('The names of the criteria must be given to load ' + str(name) + '.')
+            return list(CRITERIA), np.load(name).astype(np.float64)
+        C = _read_header(name)[0]
+        B = np.loadtxt(name, delimiter=',', dtype=np.float64, skiprows=1, ndmin=2)
+        if B.shape != (len(C), 4):
+            raise ValueError(str(name) + ' must contain ' + str(len(C)) + ' rows of 4 values, got '
+                             + str(B.shape) + '.')
+        return C, B
+
+
+def check_criteria(CRITERIA, OTHERS):
+    """
+    Checks that several files list the same criteria in the same order.
+
+    :param CRITERIA: List containing the names of the criteria of the criteria file.
+
+    :param OTHERS: Dictionary in which the keys are the names of the other files and the
+        values are the lists of criteria they contain.
+    """
+    for name, C in OTHERS.items():
+        if list(C) != list(CRITERIA):
+            if sorted(C) == sorted(CRITERIA):
+                raise ValueError('The criteria of ' + str(name) + ' are not in the same order as in '
+                                 'the criteria file.')
+            raise ValueError('The criteria of ' + str(name) + ' do not match the criteria file: '
+                             + str(sorted(set(C) ^ set(CRITERIA))) + '.')
+
+
+def load_problem(CRIT, PERF, PROFILES):
+    """
+    Loads all the data of a problem into arrays and checks that the criteria are given
+    in the same order in every file.
+
+    :param CRIT: Name of the file of the criteria and weightings.
+
+    :param PERF: Name of the file of the performances.
+
+    :param PROFILES: List containing the names of the files of the reference profiles,
+        from the lowest to the highest.
+
+    :return C: List of strings corresponding to the names of the criteria.
+
+    :return W: Array of shape (criteria,) containing the weightings.
+
+    :return A: List of strings corresponding to the names of the actions.
+
+    :return G: Array of shape (actions, criteria) containing the performances.
+
+    :return B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+    """
+    with ELECTRE_Tri_profiling.stage('load_problem', profiles=len(PROFILES)):
+        C, W = load_criteria(CRIT)
+        A, C_perf, G = load_performances(PERF, C)
+        Others = {PERF: C_perf}
+        B = []
+        for name in PROFILES:
+            C_profile, B_profile = load_profile(name, C)
+            Others[name] = C_profile
+            B.append(B_profile)
+        check_criteria(C, Others)
+        return C, W, A, G, np.stack(B) if B else np.empty((0, len(C), 4))
+
+
+def _iter_header(FILE, SIZE=1 << 20):
+    """
+    Yields one by one the comma-separated fields of the current line of FILE, reading
+    the line by pieces of at most SIZE characters so that very long header lines are
+    never held in memory at once. Quoted fields follow the rules of the csv module, so
+    that they may contain commas, doubled quotes and line breaks.
+    """
+    rest = ''
+    while True:
+        piece = FILE.readline(SIZE)
+        if not piece:
+            break
+        fields = []
+        field = None
+        for part in (rest + piece).split(','):
+            field = part if field is None else field + ',' + part
+            if not (field.startswith('"') and field.count('"') % 2):
+                fields.append(field)
+                field = None
+        if field is None and piece.endswith('\n'):
+            fields[-1] = fields[-1].rstrip('\r\n')
+            yield from map(_unquote, fields)
+            return
+        rest = fields.pop() if field is None else field
+        yield from map(_unquote, fields)
+    if rest:
+        yield _unquote(rest)
+
+
+def _unquote(FIELD):
+    """
+    Value of a field of a .csv file, removing its quotes if it is quoted.
+    """
+    if not FIELD.startswith('"'):
+        return FIELD
+    return next(csv.reader([FIELD], delimiter=','))[0]
+
+
+class PerformanceStream:
+    """
+    Streaming reader of a performance .csv file with the structure expected by
+    ELECTRE_Tri.input_performances. Iterating over the stream yields the actions by
+    blocks of BLOCK_SIZE rows, so that the memory used does not depend on the number
+    of actions in the file.
+
+    :param name: Name of the .csv file which must contain on the first line the names
+        of the actions, on the second line the names of the criteria and on the
+        following lines the performance of each action against each criterion.
+
+    :param BLOCK_SIZE: Number of actions in each block.
+    """
+
+    def __init__(self, name, BLOCK_SIZE=65536):
+        self.name = name
+        self.block_size = BLOCK_SIZE
+        with open(name, 'r') as P_csv:
+            for _ in _iter_header(P_csv):
+                pass
+            self.criteria = next(csv.reader([P_csv.readline()], delimiter=','))
+
+    def __iter__(self):
+        """
+        :return: Iterator over the tuples (A, G) where A is the list of the names of the
+            actions of the block and G is the float64 array of shape (actions, criteria)
+            of their performances.
+        """
+        with open(self.name, 'r') as A_csv, open(self.name, 'r') as P_csv:
+            names = _iter_header(A_csv)
+            for _ in _iter_header(P_csv):
+                pass
+            P_csv.readline()
+            while True:
+                rows = [row for row in islice(P_csv, self.block_size) if row.strip()]
+                if not rows:
+                    break
+                G = np.loadtxt(rows, delimiter=',', dtype=np.float64, ndmin=2)
+                if G.shape[1] != len(self.criteria):
+                    raise ValueError('The performance rows of ' + self.name + ' must have '
+                                     + str(len(self.criteria)) + ' values.')
+                A = list(islice(names, len(G)))
+                if len(A) != len(G):
+                    raise ValueError('There are more performance rows than action names in '
+                                     + self.name + '.')
+                yield A, G
+            if next(names, None) is not None:
+                raise ValueError('There are more action names than performance rows in '
+                                 + self.name + '.')
+
+
+def write_assignments(name, STREAM, CATEGORIES):
+    """
+    Writes block by block to a .csv file the categories assigned to the actions.
+
+    :param name: Name of the .csv file to write. The first line contains the headers
+        'Action', 'Pessimistic', 'Optimistic' and 'Median rank', and each following line
+        the results for one action.
+
+    :param STREAM: Iterable over the tuples (A, pessimistic, optimistic) as yielded by
+        ELECTRE_Tri.assignment_stream.
+
+    :param CATEGORIES: List containing the names of the categories, from the worst
+        to the best.
+
+    :return Counts: Dictionary containing, for the pessimistic and the optimistic
+        procedures, the number of actions assigned to each category.
+    """
+    Counts = {'Pessimistic': np.zeros(len(CATEGORIES), dtype=np.int64),
+              'Optimistic': np.zeros(len(CATEGORIES), dtype=np.int64)}
+    with open(name, 'w', newline='') as R_csv:
+        writer = csv.writer(R_csv, delimiter=',')
+        writer.writerow(['Action', 'Pessimistic', 'Optimistic', 'Median rank'])
+        for A, Pessimistic, Optimistic in STREAM:
+            Median = (Pessimistic + Optimistic) / 2
+            writer.writerows(zip(A, Pessimistic.tolist(), Optimistic.tolist(), Median.tolist()))
+            Counts['Pessimistic'] += np.bincount(Pessimistic, minlength=len(CATEGORIES) + 1)[1:]
+            Counts['Optimistic'] += np.bincount(Optimistic, minlength=len(CATEGORIES) + 1)[1:]
+    return {key: dict(zip(CATEGORIES, value.tolist())) for key, value in Counts.items()}
+
+
+def write_results(name, A, COLUMNS):
+    """
+    Writes a table of results with one row per action, in the format given by the
+    extension of the file name: .csv, .json (a list of objects, one per action) or
+    .parquet (with pandas and pyarrow).
+
+    :param name: Name of the file to write.
+
+    :param A: List of strings corresponding to the names of the actions.
+
+    :param COLUMNS: Dictionary in which the keys are the names of the columns and the
+        values are lists or arrays of shape (actions,).
+    """
+    Columns = {'Action': list(A)}
+    Columns.update({key: np.asarray(value).tolist() for key, value in COLUMNS.items()})
+    extension = _extension(name)
+    if extension == '.parquet':
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError('pandas and pyarrow are required to write ' + str(name) + '.') from None
+        pd.DataFrame(Columns).to_parquet(name, index=False)
+    elif extension == '.json':
+        with open(name, 'w') as R_json:
+            json.dump([dict(zip(Columns, row)) for row in zip(*Columns.values())], R_json, indent=1)
+    elif extension == '.csv':
+        with open(name, 'w', newline='') as R_csv:
+            writer = csv.writer(R_csv, delimiter=',')
+            writer.writerow(list(Columns))
+            writer.writerows(zip(*Columns.values()))
+    else:
+        raise ValueError('Unsupported format of results ' + repr(extension) + ', expected .csv, .json or .parquet.')
+
+
+PROBLEM_FORMAT = 1
+
+
+def save_problem(directory, C, W, A, G, B, PROFILES=None):
+    """
+    Saves a problem in the binary format read by open_problem. The directory contains
+    the file 'problem.json' with the names of the criteria and of the profiles, and the
+    .npy files 'weights', 'actions', 'performances' and 'profiles'.
+
+    :param directory: Name of the directory to create or overwrite.
+
+    :param C: List containing the names of the criteria as strings.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :param A: List containing the names of the actions as strings.
+
+    :param G: Array of shape (actions, criteria) containing the performances.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :param PROFILES: List containing the names of the reference profiles, from the
+        lowest to the highest. The profiles are numbered from 1 by default.
+    """
+    B = np.asarray(B, dtype=np.float64)
+    _write_header(directory, C, PROFILES, len(B))
+    np.save(os.path.join(directory, 'weights.npy'), np.asarray(W, dtype=np.float64))
+    np.save(os.path.join(directory, 'profiles.npy'), B)
+    np.save(os.path.join(directory, 'actions.npy'), np.asarray(A, dtype=str))
+    np.save(os.path.join(directory, 'performances.npy'), np.ascontiguousarray(G, dtype=np.float64))
+
+
+def _write_header(directory, C, PROFILES, N_PROFILES):
+    """
+    Creates the directory of a binary problem and writes its 'problem.json' file.
+    """
+    if PROFILES is None:
+        PROFILES = ['b' + str(k + 1) for k in range(N_PROFILES)]
+    if len(PROFILES) != N_PROFILES:
+        raise ValueError('There must be one name per reference profile.')
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'problem.json'), 'w') as header:
+        json.dump({'format': PROBLEM_FORMAT, 'criteria': list(C), 'profiles': list(PROFILES)}, header)
+
+
+def convert_csv_problem(CRIT, PERF, PROFILE_FILES, directory, PROFILES=None, BLOCK_SIZE=65536):
+    """
+    Converts a problem given as csv files into the binary format read by open_problem.
+    The performance file is read twice by blocks and written directly into the
+    memory-mapped output, so that it never has to fit in memory.
+
+    :param CRIT: Name of the .csv file of the criteria and weightings.
+
+    :param PERF: Name of the .csv file of the performances.
+
+    :param PROFILE_FILES: List containing the names of the .csv files of the reference
+        profiles, from the lowest to the highest.
+
+    :param directory: Name of the directory to create or overwrite.
+
+    :param PROFILES: List containing the names of the reference profiles.
+
+    :param BLOCK_SIZE: Number of actions read at once.
+    """
+    C, W = load_criteria(CRIT)
+    Stream = PerformanceStream(PERF, BLOCK_SIZE)
+    Others = {PERF: Stream.criteria}
+    B = []
+    for name in PROFILE_FILES:
+        C_profile, B_profile = load_profile(name)
+        Others[name] = C_profile
+        B.append(B_profile)
+    check_criteria(C, Others)
+    B = np.stack(B) if B else np.empty((0, len(C), 4))
+
+    n = 0
+    width = 1
+    with open(PERF, 'r') as P_csv:
+        for action in _iter_header(P_csv):
+            n += 1
+            width = max(width, len(action))
+    _write_header(directory, C, PROFILES, len(B))
+    np.save(os.path.join(directory, 'weights.npy'), W)
+    np.save(os.path.join(directory, 'profiles.npy'), B)
+    A = np.lib.format.open_memmap(os.path.join(directory, 'actions.npy'), mode='w+',
+                                  dtype='<U' + str(width), shape=(n,))
+    G = np.lib.format.open_memmap(os.path.join(directory, 'performances.npy'), mode='w+',
+                                  dtype=np.float64, shape=(n, len(C)))
+    start = 0
+    for A_block, G_block in Stream:
+        A[start:start + len(G_block)] = A_block
+        G[start:start + len(G_block)] = G_block
+        start += len(G_block)
+    A.flush()
+    G.flush()
+
+
+def open_problem(directory):
+    """
+    Opens a problem saved in the binary format. The actions and the performances are
+    memory-mapped read-only, so that opening is immediate whatever their size and the
+    pages are shared between the processes working on the same problem.
+
+    :param directory: Name of the directory written by save_problem or
+        convert_csv_problem.
+
+    :return C: List of strings corresponding to the names of the criteria.
+
+    :return W: Array of shape (criteria,) containing the weightings.
+
+    :return A: Memory-mapped array of shape (actions,) of the names of the actions.
+
+    :return G: Memory-mapped array of shape (actions, criteria) of the performances.
+
+    :return B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :return PROFILES: List containing the names of the reference profiles.
+    """
+    with open(os.path.join(directory, 'problem.json'), 'r') as header:
+        Header = json.load(header)
+    if Header.get('format') != PROBLEM_FORMAT:
+        raise ValueError(str(directory) + ' is not a problem in the format ' + str(PROBLEM_FORMAT) + '.')
+    W = np.load(os.path.join(directory, 'weights.npy'))
+    B = np.load(os.path.join(directory, 'profiles.npy'))
+    A = np.load(os.path.join(directory, 'actions.npy'), mmap_mode='r')
+    G = np.load(os.path.join(directory, 'performances.npy'), mmap_mode='r')
+    if G.shape != (len(A), len(Header['criteria'])) or B.shape[1:] != (len(Header['criteria']), 4):
+        raise ValueError('The arrays of ' + str(directory) + ' do not match its criteria.')
+    return Header['criteria'], W, A, G, B, Header['profiles']
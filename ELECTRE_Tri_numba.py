@@ -0,0 +1,138 @@
+import numpy as np
+
+import ELECTRE_Tri
+import ELECTRE_Tri_profiling
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+if numba is not None:
+    @numba.njit(cache=True, error_model='numpy', inline='always')
+    def _credibility(G, B, W, i, k, DIRECTION):
+        """
+        Credibility of ai S bk (DIRECTION = 1) or of bk S ai (DIRECTION = -1), computed
+        criterion by criterion without any temporary array.
+        """
+        GC = 0.0
+        for j in range(G.shape[1]):
+            c = (DIRECTION * (G[i, j] - B[k, j, 0]) + B[k, j, 2]) / (B[k, j, 2] - B[k, j, 1])
+            GC += W[j] * min(max(c, 0.0), 1.0)
+        Credibility = 1.0
+        for j in range(G.shape[1]):
+            d = min(max((DIRECTION * (B[k, j, 0] - G[i, j]) - B[k, j, 2]) / (B[k, j, 3] - B[k, j, 2]), 0.0), 1.0)
+            if d > GC:
+                Credibility *= (1.0 - d) / (1.0 - GC)
+        return Credibility * GC
+
+    @numba.njit(parallel=True, cache=True, error_model='numpy')
+    def _credibility_kernel(G, B, W, AB, BA):
+        for i in numba.prange(G.shape[0]):
+            for k in range(B.shape[0]):
+                AB[k, i] = _credibility(G, B, W, i, k, 1.0)
+                BA[k, i] = _credibility(G, B, W, i, k, -1.0)
+
+    @numba.njit(parallel=True, cache=True, error_model='numpy')
+    def _assignment_kernel(G, B, W, LAMBDA, PESSIMISTIC, OPTIMISTIC):
+        K = B.shape[0]
+        for i in numba.prange(G.shape[0]):
+            pessimistic = 1
+            optimistic = K + 1
+            for k in range(K):
+                if _credibility(G, B, W, i, k, 1.0) >= LAMBDA:
+                    pessimistic = k + 2
+                elif optimistic == K + 1:
+                    optimistic = k + 1
+            PESSIMISTIC[i] = pessimistic
+            OPTIMISTIC[i] = optimistic
+
+
+def _arrays(G, B, W):
+    """
+    Performances, profiles and normalised weightings as the contiguous float arrays
+    expected by the kernels.
+    """
+    W = np.asarray(W, dtype=float)
+    return (np.ascontiguousarray(G, dtype=float), np.ascontiguousarray(B, dtype=float),
+            np.ascontiguousarray(W / W.sum()))
+
+
+def credibility_pipeline(G, B, W, CHUNK_SIZE=4096):
+    """
+    Same as ELECTRE_Tri.credibility_pipeline, computed in a single parallel pass over the
+    actions by the compiled kernel when Numba is installed. The global concordances are
+    summed criterion by criterion, so that the credibilities may differ from the NumPy
+    path in the last bits.
+
+    :param G: Array of shape (actions, criteria) containing the performances.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :param CHUNK_SIZE: Number of actions processed at once by the NumPy path.
+
+    :return Credibility: Dictionary containing two arrays of shape (profiles, actions).
+        The keys are '(ai,bk)' and '(bk,ai)'.
+    """
+    if numba is None:
+        return ELECTRE_Tri.credibility_pipeline(G, B, W, CHUNK_SIZE)
+    with ELECTRE_Tri_profiling.stage('numba_credibility', actions=len(G), profiles=len(B)):
+        G, B, W = _arrays(G, B, W)
+        Credibility = {'(ai,bk)': np.empty((len(B), len(G))), '(bk,ai)': np.empty((len(B), len(G)))}
+        _credibility_kernel(G, B, W, Credibility['(ai,bk)'], Credibility['(bk,ai)'])
+        return Credibility
+
+
+def assign(G, B, W, LAMBDA, CHUNK_SIZE=4096):
+    """
+    Assigns the actions with both procedures. With Numba, the concordance, the
+    credibility and the assignment are fused in a single parallel pass over the actions
+    that only writes the categories. Without Numba, the NumPy pipeline is used.
+
+    :param G: Array of shape (actions, criteria) containing the performances.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :param CHUNK_SIZE: Number of actions processed at once by the NumPy path.
+
+    :return Pessimistic: Array of shape (actions,) of the pessimistic categories, from 1
+        (worst) to profiles + 1 (best).
+
+    :return Optimistic: Array of shape (actions,) of the optimistic categories.
+    """
+    if numba is None:
+        Outranking = ELECTRE_Tri.outranking(ELECTRE_Tri.credibility_pipeline(G, B, W, CHUNK_SIZE), LAMBDA)
+        return ELECTRE_Tri.pessimistic_assignment(Outranking), ELECTRE_Tri.optimistic_assignment(Outranking)
+    with ELECTRE_Tri_profiling.stage('numba_assignment', actions=len(G), profiles=len(B)):
+        G, B, W = _arrays(G, B, W)
+        dtype = ELECTRE_Tri._category_dtype(len(B))
+        Pessimistic = np.empty(len(G), dtype=dtype)
+        Optimistic = np.empty(len(G), dtype=dtype)
+        _assignment_kernel(G, B, W, float(LAMBDA), Pessimistic, Optimistic)
+        return Pessimistic, Optimistic
+
+
+def compile_kernels():
+    """
+    Compiles the kernels, or loads them from the cache written next to this module by a
+    previous compilation on the same machine, so that the first real call does not pay
+    for it.
+
+    :return: True if the compiled kernels are available, False if Numba is not installed.
+    """
+    if numba is None:
+        return False
+    G = np.zeros((1, 1))
+    B = np.array([[[0.0, 0.0, 1.0, 2.0]]])
+    credibility_pipeline(G, B, np.ones(1))
+    assign(G, B, np.ones(1), 0.5)
+    return True
@@ -0,0 +1,152 @@
+import numpy as np
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import ELECTRE_Tri
+import ELECTRE_Tri_io
+import ELECTRE_Tri_profiling
+
+
+def block_sizes(N_CRITERIA, N_PROFILES, MEMORY_BUDGET, WORKERS=1, CHUNK_SIZE=4096):
+    """
+    Numbers of actions per block and per chunk keeping the memory allocated by WORKERS
+    blocks processed at the same time within a budget. A chunk allocates the concordance
+    and discordance arrays of its actions and their temporaries, about 8 arrays of shape
+    (profiles, chunk, criteria); a block keeps a copy of its performances, its
+    credibilities, its outranking relations and its categories.
+
+    :param N_CRITERIA: Number of criteria.
+
+    :param N_PROFILES: Number of reference profiles.
+
+    :param MEMORY_BUDGET: Number of bytes that the blocks may allocate in total.
+
+    :param WORKERS: Number of blocks processed at the same time.
+
+    :param CHUNK_SIZE: Largest number of actions per chunk.
+
+    :return block: Number of actions per block.
+
+    :return chunk: Number of actions per chunk.
+    """
+    Budget = MEMORY_BUDGET // max(WORKERS, 1)
+    chunk_bytes = 8 * N_PROFILES * N_CRITERIA * 8
+    row_bytes = N_CRITERIA * 8 + N_PROFILES * 18 + 2
+    chunk = min(CHUNK_SIZE, Budget // 2 // chunk_bytes)
+    if chunk < 1:
+        raise ValueError('A memory budget of ' + str(MEMORY_BUDGET) + ' bytes is too small for '
+                         + str(WORKERS) + ' workers.')
+    block = (Budget - chunk * chunk_bytes) // row_bytes
+    return int(max(block, chunk)), int(chunk)
+
+
+def _write_summary(name, SUMMARY):
+    """
+    Replaces the summary file atomically, so that it is always complete when read.
+    """
+    with open(name + '.tmp', 'w') as summary:
+        json.dump(SUMMARY, summary, indent=2)
+    os.replace(name + '.tmp', name)
+
+
+def run_out_of_core(G, B, W, LAMBDA, directory, CATEGORIES=None, MEMORY_BUDGET=1 << 30, WORKERS=None,
+                    CHUNK_SIZE=4096):
+    """
+    Assigns the actions of a performance matrix larger than the memory, such as the
+    memory-mapped array of ELECTRE_Tri_io.open_problem, block by block. The blocks are
+    processed by a pool of threads, NumPy releasing the GIL during the computations, and
+    at most WORKERS blocks are in memory at the same time. The categories are written to
+    the memory-mapped files 'pessimistic.npy' and 'optimistic.npy' of the directory as
+    the blocks end, and 'summary.json' is updated after each block with the numbers of
+    actions processed and of actions per category.
+
+    :param G: Array of shape (actions, criteria) containing the performances, usually
+        memory-mapped.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :param directory: Name of the directory of the results, created if needed.
+
+    :param CATEGORIES: List containing the names of the categories, from the worst to
+        the best. The categories are numbered from 1 by default.
+
+    :param MEMORY_BUDGET: Number of bytes that the blocks may allocate in total, which
+        sets the number of actions per block.
+
+    :param WORKERS: Number of threads, the number of processors by default.
+
+    :param CHUNK_SIZE: Largest number of actions processed at once inside a block.
+
+    :return Summary: Dictionary written as 'summary.json'.
+    """
+    B = np.asarray(B, dtype=float)
+    W = np.asarray(W, dtype=float)
+    n, m = G.shape
+    WORKERS = WORKERS or os.cpu_count() or 1
+    block, chunk = block_sizes(m, len(B), MEMORY_BUDGET, WORKERS, CHUNK_SIZE)
+    if CATEGORIES is None:
+        CATEGORIES = ['C' + str(k + 1) for k in range(len(B) + 1)]
+    os.makedirs(directory, exist_ok=True)
+    dtype = ELECTRE_Tri._category_dtype(len(B))
+    Results = {key: np.lib.format.open_memmap(os.path.join(directory, key + '.npy'), mode='w+',
+                                              dtype=dtype, shape=(n,))
+               for key in ('pessimistic', 'optimistic')}
+    Counts = {key: np.zeros(len(CATEGORIES), dtype=np.int64) for key in Results}
+    Summary = {'actions': n, 'processed': 0, 'block_size': block, 'chunk_size': chunk,
+               'lambda': LAMBDA, 'categories': list(CATEGORIES)}
+    summary_name = os.path.join(directory, 'summary.json')
+
+    def process(start, stop):
+        with ELECTRE_Tri_profiling.stage('out_of_core_block', actions=stop - start):
+            Credibility = ELECTRE_Tri.credibility_pipeline(G[start:stop], B, W, chunk)
+            Outranking = ELECTRE_Tri.outranking(Credibility, LAMBDA)
+            del Credibility
+            Results['pessimistic'][start:stop] = ELECTRE_Tri.pessimistic_assignment(Outranking)
+            Results['optimistic'][start:stop] = ELECTRE_Tri.optimistic_assignment(Outranking)
+            return {key: np.bincount(Result[start:stop], minlength=len(CATEGORIES) + 1)[1:]
+                    for key, Result in Results.items()}, stop - start
+
+    def collect(DONE):
+        for Future in DONE:
+            Block_counts, size = Future.result()
+            for key in Counts:
+                Counts[key] += Block_counts[key]
+            Summary['processed'] += size
+        Summary['counts'] = {key: dict(zip(CATEGORIES, value.tolist())) for key, value in Counts.items()}
+        _write_summary(summary_name, Summary)
+
+    with ThreadPoolExecutor(WORKERS) as executor:
+        Pending = set()
+        for start in range(0, n, block):
+            if len(Pending) >= WORKERS:
+                Done, Pending = wait(Pending, return_when=FIRST_COMPLETED)
+                collect(Done)
+            Pending.add(executor.submit(process, start, min(start + block, n)))
+        collect(wait(Pending)[0])
+    for Result in Results.values():
+        Result.flush()
+    return Summary
+
+
+def sort_problem(problem, LAMBDA, directory, CATEGORIES=None, MEMORY_BUDGET=1 << 30, WORKERS=None):
+    """
+    Assigns the actions of a problem saved in the binary format of ELECTRE_Tri_io with
+    run_out_of_core, the performances being memory-mapped.
+
+    :param problem: Name of the directory written by ELECTRE_Tri_io.save_problem or
+        ELECTRE_Tri_io.convert_csv_problem.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :param directory: Name of the directory of the results.
+
+    :return Summary: Dictionary written as 'summary.json'.
+    """
+    C, W, A, G, B, PROFILES = ELECTRE_Tri_io.open_problem(problem)
+    return run_out_of_core(G, B, W, LAMBDA, directory, CATEGORIES, MEMORY_BUDGET, WORKERS)
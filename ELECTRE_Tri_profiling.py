@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+_RECORDERS = []
+_OPEN_STAGES = []
+_MEMORY_LOCK = threading.Lock()
+
+
+class _NullStage:
+    """
+    Context manager doing nothing, returned by stage when no recorder is active.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *EXCEPTION):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def _traced_memory():
+    """
+    Current size of the traced memory blocks. The peak reached so far is first passed
+    to the open stages and then reset, so that nested stages do not hide the peak of
+    the enclosing ones. The peak is only reset when tracemalloc was started by a
+    recorder, leaving the peak of a caller tracing the memory itself untouched, and
+    when tracemalloc.reset_peak exists (Python 3.9 or later). Otherwise the peak is the
+    largest size since tracemalloc started, which bounds the peak of the stage from
+    above.
+    """
+    current, peak = tracemalloc.get_traced_memory()
+    for Stage in _OPEN_STAGES:
+        Stage.peak = max(Stage.peak, peak)
+    if hasattr(tracemalloc, 'reset_peak') and any(Recorder._started_tracing for Recorder in _RECORDERS):
+        tracemalloc.reset_peak()
+    return current
+
+
+class _Stage:
+    """
+    Context manager measuring one stage for the active recorders.
+    """
+
+    def __init__(self, NAME, DETAILS):
+        self.name = NAME
+        self.details = DETAILS
+
+    def __enter__(self):
+        self.tracing = tracemalloc.is_tracing()
+        if self.tracing:
+            with _MEMORY_LOCK:
+                self.memory = self.peak = _traced_memory()
+                _OPEN_STAGES.append(self)
+        self.cpu = time.process_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *EXCEPTION):
+        end = time.perf_counter()
+        Event = {'stage': self.name, 'start': self.start, 'wall': end - self.start,
+                 'cpu': time.process_time() - self.cpu, 'thread': threading.get_ident()}
+        if self.tracing:
+            with _MEMORY_LOCK:
+                memory = _traced_memory()
+                _OPEN_STAGES.remove(self)
+            Event['allocated'] = self.peak - self.memory
+            Event['retained'] = memory - self.memory
+        Event.update(self.details)
+        for Recorder in _RECORDERS:
+            Recorder.record(Event)
+        return False
+
+
+def stage(NAME, **DETAILS):
+    """
+    Context manager measuring the wall time, the CPU time and, when tracemalloc is
+    tracing, the peak of the memory allocated by a stage of the pipeline. When no
+    recorder is active, a shared context manager doing nothing is returned, so that the
+    instrumentation can stay in place at the cost of one function call.
+
+    :param NAME: Name of the stage.
+
+    :param DETAILS: Additional values recorded with the stage, such as the numbers of
+        actions, criteria or profiles, the number of elements processed or the name of
+        the profile.
+    """
+    if not _RECORDERS:
+        return _NULL_STAGE
+    return _Stage(NAME, DETAILS)
+
+
+class Recorder:
+    """
+    Context manager recording the stages of the pipeline run while it is active.
+
+        with ELECTRE_Tri_profiling.Recorder() as recorder:
+            ELECTRE_Tri.credibility_pipeline(G, B, W)
+        recorder.write_chrome_trace('trace.json')
+
+    :param TRACE_MEMORY: Whether to trace the memory allocations with tracemalloc, which
+        slows the pipeline down. Each stage then records the peak of the memory it
+        allocated ('allocated') and the memory it still holds at its end ('retained').
+        The peaks are exact when tracemalloc is started by the recorder on Python 3.9 or
+        later, and upper bounds otherwise.
+
+    :param CALLBACK: Function called with each event as soon as its stage ends.
+    """
+
+    def __init__(self, TRACE_MEMORY=False, CALLBACK=None):
+        self.trace_memory = TRACE_MEMORY
+        self.callback = CALLBACK
+        self.events = []
+        self._lock = threading.Lock()
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.origin = time.perf_counter()
+        _RECORDERS.append(self)
+        return self
+
+    def __exit__(self, *EXCEPTION):
+        _RECORDERS.remove(self)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def record(self, EVENT):
+        """
+        Stores an event and passes it to the callback.
+
+        :param EVENT: Dictionary with at least the keys 'stage', 'start', 'wall', 'cpu'
+            and 'thread'.
+        """
+        with self._lock:
+            self.events.append(EVENT)
+        if self.callback is not None:
+            self.callback(EVENT)
+
+    def summary(self):
+        """
+        Totals of the recorded events by stage.
+
+        :return Summary: Dictionary in which the keys are the names of the stages and the
+            values are dictionaries giving the number of calls and the total wall time,
+            CPU time and, if traced, the largest allocation.
+        """
+        Summary = {}
+        for Event in self.events:
+            Total = Summary.setdefault(Event['stage'], {'calls': 0, 'wall': 0.0, 'cpu': 0.0})
+            Total['calls'] += 1
+            Total['wall'] += Event['wall']
+            Total['cpu'] += Event['cpu']
+            if 'allocated' in Event:
+                Total['allocated'] = max(Total.get('allocated', 0), Event['allocated'])
+        return Summary
+
+    def write_log(self, name):
+        """
+        Writes the events as a structured log, one JSON object per line.
+
+        :param name: Name of the file to write.
+        """
+        with open(name, 'w') as log:
+            for Event in self.events:
+                log.write(json.dumps(dict(Event, start=Event['start'] - self.origin)) + '\n')
+
+    def write_chrome_trace(self, name):
+        """
+        Writes the events in the Chrome trace event format, which can be opened with
+        chrome://tracing or Perfetto.
+
+        :param name: Name of the file to write.
+        """
+        Events = []
+        for Event in self.events:
+            Args = {key: value for key, value in Event.items() if key not in ('stage', 'start', 'wall', 'thread')}
+            Events.append({'name': Event['stage'], 'cat': 'ELECTRE_Tri', 'ph': 'X',
+                           'ts': (Event['start'] - self.origin) * 1e6, 'dur': Event['wall'] * 1e6,
+                           'pid': os.getpid(), 'tid': Event['thread'], 'args': Args})
+        with open(name, 'w') as trace:
+            json.dump({'traceEvents': Events, 'displayTimeUnit': 'ms'}, trace)
@@ -0,0 +1,447 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+import ELECTRE_Tri
+
+
+def lambda_breakpoints(CREDIBILITY):
+    """
+    Calculates the critical values of the cutting threshold at which the actions change
+    category. Both sorting procedures only depend on whether the credibility of ai over
+    bk reaches the cutting threshold, so that the category of an action is a step
+    function of LAMBDA: it equals 1 plus the number of breakpoints greater than or equal
+    to LAMBDA.
+
+    :param CREDIBILITY: Dictionary containing the credibility arrays of shape
+        (profiles, actions), as returned by ELECTRE_Tri.credibility_pipeline.
+
+    :return Breakpoints: Dictionary containing two arrays of shape (profiles, actions)
+        with the keys 'pessimistic' and 'optimistic'. The action is assigned to a
+        category above Ck+1 as long as LAMBDA does not exceed the k-th breakpoint.
+        For the pessimistic procedure it is the highest credibility over the profiles
+        bk to bK and for the optimistic procedure the lowest over the profiles b1 to bk.
+    """
+    S = np.asarray(CREDIBILITY['(ai,bk)'], dtype=float)
+    Breakpoints = {}
+    Breakpoints['pessimistic'] = np.maximum.accumulate(S[::-1], axis=0)[::-1]
+    Breakpoints['optimistic'] = np.minimum.accumulate(S, axis=0)
+    return Breakpoints
+
+
+def lambda_assignment(BREAKPOINTS, LAMBDA):
+    """
+    Assigns every action to a category for a given cutting threshold using the
+    breakpoints computed once by lambda_breakpoints.
+
+    :param BREAKPOINTS: Dictionary of breakpoint arrays of shape (profiles, actions).
+
+    :param LAMBDA: Cutting threshold value.
+
+    :return Category: Dictionary containing, for the keys 'pessimistic' and
+        'optimistic', the arrays of shape (actions,) of the category numbers.
+    """
+    Category = {}
+    for procedure, Breakpoint in BREAKPOINTS.items():
+        dtype = ELECTRE_Tri._category_dtype(len(Breakpoint))
+        Category[procedure] = (1 + np.count_nonzero(Breakpoint >= LAMBDA, axis=0)).astype(dtype)
+    return Category
+
+
+def lambda_sweep(CREDIBILITY, LAMBDAS):
+    """
+    Assigns every action to a category for a whole vector of cutting thresholds in a
+    single pass. The thresholds are sorted once and each breakpoint is located among them
+    with np.searchsorted, so that the credibility is never recomputed.
+
+    :param CREDIBILITY: Dictionary containing the credibility arrays of shape
+        (profiles, actions), as returned by ELECTRE_Tri.credibility_pipeline.
+
+    :param LAMBDAS: Array of shape (lambdas,) containing the cutting thresholds.
+
+    :return Category: Dictionary containing, for the keys 'pessimistic' and
+        'optimistic', the arrays of shape (lambdas, actions) of the category numbers,
+        in the order of LAMBDAS.
+    """
+    LAMBDAS = np.asarray(LAMBDAS, dtype=float)
+    Order = np.argsort(LAMBDAS, kind='stable')
+    Sorted = LAMBDAS[Order]
+    Category = {}
+    for procedure, Breakpoint in lambda_breakpoints(CREDIBILITY).items():
+        K, n = Breakpoint.shape
+        # Number of sorted thresholds lower than or equal to each breakpoint: the
+        # action reaches the category above Ck+1 for the thresholds of lower index.
+        Index = np.searchsorted(Sorted, Breakpoint, side='right')
+        Rows = np.arange(len(Sorted))[:, np.newaxis]
+        Sweep = np.ones((len(Sorted), n), dtype=ELECTRE_Tri._category_dtype(K))
+        for k in range(K):
+            Sweep += Rows < Index[k]
+        Sweep[Order] = Sweep.copy()
+        Category[procedure] = Sweep
+    return Category
+
+
+def lambda_intervals(CREDIBILITY, LAMBDA):
+    """
+    Calculates, for every action, the exact interval of cutting thresholds over which its
+    category stays the one obtained with LAMBDA.
+
+    :param CREDIBILITY: Dictionary containing the credibility arrays of shape
+        (profiles, actions), as returned by ELECTRE_Tri.credibility_pipeline.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :return Intervals: Dictionary containing, for the keys 'pessimistic' and
+        'optimistic', a tuple of two arrays of shape (actions,) with the bounds of the
+        interval. The category is unchanged for any threshold strictly greater than the
+        lower bound and lower than or equal to the upper bound. The lower bound is -inf
+        and the upper bound +inf when the category cannot change on that side.
+    """
+    Intervals = {}
+    for procedure, Breakpoint in lambda_breakpoints(CREDIBILITY).items():
+        Reached = Breakpoint >= LAMBDA
+        Lower = np.max(np.where(Reached, -np.inf, Breakpoint), axis=0, initial=-np.inf)
+        Upper = np.min(np.where(Reached, Breakpoint, np.inf), axis=0, initial=np.inf)
+        Intervals[procedure] = (Lower, Upper)
+    return Intervals
+
+
+def perturb_parameters(W, B, N_SAMPLES, RNG, WEIGHT_SPREAD=0.1, THRESHOLD_SPREAD=0.1):
+    """
+    Draws perturbed sets of weightings and thresholds. Every weighting and every
+    indifference, preference and veto threshold is multiplied by an independent factor
+    drawn uniformly around 1, and the thresholds of each profile and criterion are then
+    sorted again so that qk <= pk <= vk. The reference profiles bk are not perturbed.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :param N_SAMPLES: Number of parameter sets to draw.
+
+    :param RNG: numpy.random.Generator used for the draws.
+
+    :param WEIGHT_SPREAD: Relative half-width of the perturbation of the weightings.
+
+    :param THRESHOLD_SPREAD: Relative half-width of the perturbation of the thresholds.
+
+    :return Ws: Array of shape (samples, criteria) of the perturbed weightings.
+
+    :return Bs: Array of shape (samples, profiles, criteria, 4) of the perturbed
+        profiles and thresholds.
+    """
+    W = np.asarray(W, dtype=float)
+    B = np.asarray(B, dtype=float)
+    Ws = W * RNG.uniform(1 - WEIGHT_SPREAD, 1 + WEIGHT_SPREAD, (N_SAMPLES,) + W.shape)
+    Bs = np.repeat(B[np.newaxis], N_SAMPLES, axis=0)
+    Bs[..., 1:] *= RNG.uniform(1 - THRESHOLD_SPREAD, 1 + THRESHOLD_SPREAD, Bs[..., 1:].shape)
+    Bs[..., 1:] = np.sort(Bs[..., 1:], axis=-1)
+    return Ws, Bs
+
+
+_PROBLEM = None
+
+
+def _set_problem(*PROBLEM):
+    """
+    Stores the problem in the worker processes, so that it is sent once per worker
+    rather than once per chunk of samples.
+    """
+    global _PROBLEM
+    _PROBLEM = PROBLEM
+
+
+def _acceptability_chunk(CHUNK):
+    """
+    Counts, for one chunk of samples, how many times each action is assigned to each
+    category. The draws of a chunk only depend on the seed and on the chunk number.
+    """
+    G, B, W, LAMBDA, N_SAMPLES, SEED, WEIGHT_SPREAD, THRESHOLD_SPREAD, SAMPLE_CHUNK = _PROBLEM
+    RNG = np.random.default_rng([SEED, CHUNK])
+    Ws, Bs = perturb_parameters(W, B, min(SAMPLE_CHUNK, N_SAMPLES - CHUNK * SAMPLE_CHUNK), RNG,
+                                WEIGHT_SPREAD, THRESHOLD_SPREAD)
+    n, n_categories = len(G), len(B) + 1
+    Offset = np.arange(n) * n_categories - 1
+    Counts = {'pessimistic': np.zeros(n * n_categories, dtype=np.int64),
+              'optimistic': np.zeros(n * n_categories, dtype=np.int64)}
+    for Ws_sample, Bs_sample in zip(Ws, Bs):
+        Outranking = ELECTRE_Tri.outranking(ELECTRE_Tri.credibility_pipeline(G, Bs_sample, Ws_sample), LAMBDA)
+        Counts['pessimistic'] += np.bincount(Offset + ELECTRE_Tri.pessimistic_assignment(Outranking),
+                                             minlength=n * n_categories)
+        Counts['optimistic'] += np.bincount(Offset + ELECTRE_Tri.optimistic_assignment(Outranking),
+                                            minlength=n * n_categories)
+    return Counts
+
+
+def acceptability(G, B, W, LAMBDA, N_SAMPLES, SEED=0, WEIGHT_SPREAD=0.1, THRESHOLD_SPREAD=0.1,
+                  WORKERS=1, SAMPLE_CHUNK=64):
+    """
+    Estimates by Monte Carlo simulation how often each action is assigned to each
+    category when the weightings and the thresholds are uncertain. The samples are drawn
+    and evaluated by chunks of SAMPLE_CHUNK, each with its own random generator seeded by
+    SEED and the chunk number, so that the result does not depend on WORKERS.
+
+    :param G: Array of shape (actions, criteria) containing the performances.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :param N_SAMPLES: Number of perturbed parameter sets.
+
+    :param SEED: Seed of the random generators.
+
+    :param WEIGHT_SPREAD: Relative half-width of the perturbation of the weightings.
+
+    :param THRESHOLD_SPREAD: Relative half-width of the perturbation of the thresholds.
+
+    :param WORKERS: Number of processes evaluating the chunks. With 1, the chunks are
+        evaluated in the calling process.
+
+    :param SAMPLE_CHUNK: Number of samples drawn and evaluated at once.
+
+    :return Acceptability: Dictionary containing, for the keys 'pessimistic' and
+        'optimistic', the arrays of shape (actions, categories) of the share of the
+        samples in which each action is assigned to each category.
+    """
+    if N_SAMPLES < 1 or SAMPLE_CHUNK < 1:
+        raise ValueError('N_SAMPLES and SAMPLE_CHUNK must be at least 1, got ' + str(N_SAMPLES) + ' and '
+                         + str(SAMPLE_CHUNK) + '.')
+    G = np.asarray(G, dtype=float)
+    Problem = (G, np.asarray(B, dtype=float), np.asarray(W, dtype=float), LAMBDA, N_SAMPLES, SEED,
+               WEIGHT_SPREAD, THRESHOLD_SPREAD, SAMPLE_CHUNK)
+    Chunks = range(-(-N_SAMPLES // SAMPLE_CHUNK))
+    Total = {'pessimistic': 0, 'optimistic': 0}
+    if WORKERS == 1:
+        _set_problem(*Problem)
+        Results = map(_acceptability_chunk, Chunks)
+    else:
+        Executor = ProcessPoolExecutor(WORKERS, initializer=_set_problem, initargs=Problem)
+        Results = Executor.map(_acceptability_chunk, Chunks)
+    try:
+        for Counts in Results:
+            for procedure in Total:
+                Total[procedure] = Total[procedure] + Counts[procedure]
+    finally:
+        if WORKERS != 1:
+            Executor.shutdown()
+        else:
+            global _PROBLEM
+            _PROBLEM = None
+    return {procedure: Counts.reshape(len(G), -1) / N_SAMPLES for procedure, Counts in Total.items()}
+
+
+def critical_concordance(DISCORDANCE, LAMBDA, ITERATIONS=64):
+    """
+    Calculates the global concordance at which the credibility reaches the cutting
+    threshold. For given partial discordances, the credibility is a continuous,
+    increasing function of the global concordance C: between two consecutive
+    discordances it equals C * prod(1 - dj) / (1 - C)^r, where the product runs over the
+    r criteria whose discordance exceeds C. The segment containing the cutting threshold
+    is found from the values at the sorted discordances, and the equation is then solved
+    on that segment, in closed form for r <= 1 and by bisection otherwise.
+
+    :param DISCORDANCE: Array of shape (..., criteria) containing the partial
+        discordances.
+
+    :param LAMBDA: Cutting threshold value, between 0 and 1.
+
+    :param ITERATIONS: Number of bisection steps, when two or more criteria veto.
+
+    :return Critical: Array of shape (...) such that ai outranks bk exactly when the
+        global concordance is greater than or equal to it, up to rounding.
+    """
+    Sorted = -np.sort(-np.asarray(DISCORDANCE, dtype=float), axis=-1)
+    m = Sorted.shape[-1]
+    Ones = np.ones(Sorted.shape[:-1] + (1,))
+    # Segment r covers [L_r, U_r], where the r largest discordances exceed C.
+    L = np.concatenate((Sorted, 0 * Ones), axis=-1)
+    U = np.concatenate((Ones, Sorted), axis=-1)
+    P = np.concatenate((Ones, np.cumprod(1 - Sorted, axis=-1)), axis=-1)
+    R = np.arange(m + 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Value = np.nan_to_num(L * P / (1 - L) ** R, nan=0.0)
+    r = np.count_nonzero(Value > LAMBDA, axis=-1)[..., np.newaxis]
+    Lower, Upper, P = (np.take_along_axis(Array, r, axis=-1)[..., 0] for Array in (L, U, P))
+    r = r[..., 0]
+    # Closed forms without veto and with one vetoing criterion, bisection beyond.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Critical = np.where(r == 0, LAMBDA, LAMBDA / (P + LAMBDA))
+    Critical = np.clip(Critical, Lower, Upper)
+    Several = np.flatnonzero(r.ravel() > 1)
+    if len(Several):
+        Lower, Upper, P, r = (Array.ravel()[Several] for Array in (Lower, Upper, P, r))
+        for _ in range(ITERATIONS):
+            Middle = (Lower + Upper) / 2
+            Above = Middle * P >= LAMBDA * (1 - Middle) ** r
+            Upper = np.where(Above, Middle, Upper)
+            Lower = np.where(Above, Lower, Middle)
+        Critical.ravel()[Several] = Upper
+    return Critical
+
+
+def _relevant_profiles(S):
+    """
+    Masks of shape (profiles, actions) of the outranking relations that determine the
+    category of each action: for the pessimistic procedure, the relation with the profile
+    below the category and with every profile above it; for the optimistic procedure,
+    the relations with every profile up to the one above the category.
+    """
+    Outranking = {'(ai,bk)': S}
+    k = np.arange(len(S))[:, np.newaxis]
+    return {'pessimistic': k >= ELECTRE_Tri.pessimistic_assignment(Outranking).astype(int) - 2,
+            'optimistic': k <= ELECTRE_Tri.optimistic_assignment(Outranking).astype(int) - 1}
+
+
+def _intersect(RELEVANT, LOWER, UPPER, AXIS=0):
+    """
+    Intersection over the relevant profiles of the intervals keeping each relation.
+    """
+    return (np.max(np.where(RELEVANT, LOWER, -np.inf), axis=AXIS),
+            np.min(np.where(RELEVANT, UPPER, np.inf), axis=AXIS))
+
+
+def weight_intervals(G, B, W, LAMBDA, CHUNK_SIZE=16384):
+    """
+    Calculates, for every action and criterion, the exact interval over which the
+    weighting of the criterion can move, the other weightings being unchanged, without
+    changing the category of the action. The global concordance with a profile is a
+    monotonic function of one weighting and the credibility an increasing function of
+    the global concordance, so that each outranking relation changes at most once, when
+    the global concordance crosses critical_concordance.
+
+    :param G: Array of shape (actions, criteria) containing the performances.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :param W: Array of shape (criteria,) containing the weightings, not necessarily
+        normalised; the intervals are given in the same unit.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :param CHUNK_SIZE: Number of actions processed at once.
+
+    :return Intervals: Dictionary containing, for the keys 'pessimistic' and
+        'optimistic', a tuple of two arrays of shape (criteria, actions) with the bounds
+        of the interval of the weighting. The category changes beyond the bounds; the
+        upper bound is +inf when no weighting, however large, changes it.
+    """
+    G = np.asarray(G, dtype=float)
+    B = np.asarray(B, dtype=float)
+    W = np.asarray(W, dtype=float)
+    Total = W.sum()
+    n, m = G.shape
+    Intervals = {procedure: (np.empty((m, n)), np.empty((m, n))) for procedure in ('pessimistic', 'optimistic')}
+    for start in range(0, n, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, n)
+        C = ELECTRE_Tri.concordance_tensor(G[start:stop], B)['(ai,bk)']
+        D = ELECTRE_Tri.discordance_tensor(G[start:stop], B)['(ai,bk)']
+        GC = C @ (W / Total)
+        S = ELECTRE_Tri._credibility_kernel(GC, D, np.empty(GC.shape)) >= LAMBDA
+        Critical = critical_concordance(D, LAMBDA)
+        Relevant = _relevant_profiles(S)
+        for j in range(m):
+            c = C[:, :, j]
+            # Global concordance as a function of the weighting t of the criterion j:
+            # (A + t c) / (T + t), which crosses the critical value at t = Crossing.
+            T = Total - W[j]
+            A = GC * Total - W[j] * c
+            with np.errstate(divide='ignore', invalid='ignore'):
+                Crossing = (Critical * T - A) / (c - Critical)
+            Increasing = c > Critical
+            Decreasing = c < Critical
+            Lower = np.where(Increasing & S, np.minimum(Crossing, W[j]), -np.inf)
+            Lower = np.where(Decreasing & ~S, np.minimum(Crossing, W[j]), Lower)
+            Upper = np.where(Increasing & ~S, np.maximum(Crossing, W[j]), np.inf)
+            Upper = np.where(Decreasing & S, np.maximum(Crossing, W[j]), Upper)
+            for procedure, Interval in Intervals.items():
+                Bounds = _intersect(Relevant[procedure], Lower, Upper)
+                Interval[0][j, start:stop] = np.maximum(Bounds[0], 0)
+                Interval[1][j, start:stop] = Bounds[1]
+    return Intervals
+
+
+def profile_intervals(G, B, W, LAMBDA, CHUNK_SIZE=16384):
+    """
+    Calculates, for every action, profile and criterion, the exact interval over which
+    the value bk of the profile on the criterion can move, its thresholds moving with
+    it, without changing the category of the action. Raising bk lowers the partial
+    concordance of the action, piecewise linearly between g + qk and g + pk, then raises
+    its partial discordance, piecewise linearly between g + pk and g + vk: the
+    credibility is non-increasing in bk and the relation changes at most once, at a
+    value found on the piece where it crosses the cutting threshold.
+
+    :param G: Array of shape (actions, criteria) containing the performances.
+
+    :param B: Array of shape (profiles, criteria, 4) containing, for each profile and
+        criterion, the values of bk, qk, pk and vk.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :param LAMBDA: Cutting threshold value.
+
+    :param CHUNK_SIZE: Number of actions processed at once.
+
+    :return Intervals: Dictionary containing, for the keys 'pessimistic' and
+        'optimistic', a tuple of two arrays of shape (profiles, criteria, actions) with
+        the bounds of the interval of bk. The category changes beyond the bounds, except
+        where they are those of the neighbouring profiles bk-1 and bk+1, to which the
+        intervals are restricted so that the profiles stay ordered.
+    """
+    G = np.asarray(G, dtype=float)
+    B = np.asarray(B, dtype=float)
+    W = np.asarray(W, dtype=float)
+    W = W / W.sum()
+    n, m = G.shape
+    K = len(B)
+    Below = np.vstack((np.full((1, m), -np.inf), B[:-1, :, 0]))[:, :, np.newaxis]
+    Above = np.vstack((B[1:, :, 0], np.full((1, m), np.inf)))[:, :, np.newaxis]
+    Intervals = {procedure: (np.empty((K, m, n)), np.empty((K, m, n))) for procedure in ('pessimistic', 'optimistic')}
+    for start in range(0, n, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, n)
+        C = ELECTRE_Tri.concordance_tensor(G[start:stop], B)['(ai,bk)']
+        D = ELECTRE_Tri.discordance_tensor(G[start:stop], B)['(ai,bk)']
+        GC = C @ W
+        S = ELECTRE_Tri._credibility_kernel(GC, D, np.empty(GC.shape)) >= LAMBDA
+        Critical = critical_concordance(D, LAMBDA)
+        Relevant = _relevant_profiles(S)
+        Lower = np.empty((K, m, stop - start))
+        Upper = np.empty((K, m, stop - start))
+        for j in range(m):
+            g = G[start:stop, j]
+            b, q, p, v = (B[:, j, t, np.newaxis] for t in range(4))
+            # Global concordance and critical value without the criterion j.
+            Others = GC - W[j] * C[:, :, j]
+            Vetoing = D[:, :, j] >= Critical
+            Critical_others = Critical.copy()
+            if Vetoing.any():
+                D_others = D[Vetoing]
+                D_others[:, j] = 0
+                Critical_others[Vetoing] = critical_concordance(D_others, LAMBDA)
+            # Partial concordance needed on the piece g + qk <= bk <= g + pk.
+            with np.errstate(divide='ignore', invalid='ignore'):
+                Needed = (Critical_others - Others) / W[j]
+            Needed = np.where(Others >= Critical_others, np.minimum(Needed, 0), Needed)
+            Crossing = np.where(Needed > 1, -np.inf, g + p - Needed * (p - q))
+            # Beyond g + pk, partial discordance tolerated with a null partial concordance.
+            Beyond = Needed <= 0
+            if Beyond.any():
+                D_others = D[Beyond]
+                D_others[:, j] = 0
+                Others_beyond = Others[Beyond]
+                Credibility = ELECTRE_Tri._credibility_kernel(Others_beyond, D_others, np.empty(len(D_others)))
+                Tolerated = np.clip(1 - LAMBDA / Credibility * (1 - Others_beyond), 0, 1)
+                Crossing[Beyond] = (np.broadcast_to(g + p, Beyond.shape)[Beyond]
+                                    + Tolerated * np.broadcast_to(v - p, Beyond.shape)[Beyond])
+            # The relation holds for bk up to the crossing.
+            Lower[:, j] = np.where(S, -np.inf, np.minimum(Crossing, b))
+            Upper[:, j] = np.where(S, np.maximum(Crossing, b), np.inf)
+        for procedure, Interval in Intervals.items():
+            Mask = Relevant[procedure][:, np.newaxis, :]
+            Interval[0][:, :, start:stop] = np.maximum(np.where(Mask, Lower, -np.inf), Below)
+            Interval[1][:, :, start:stop] = np.minimum(np.where(Mask, Upper, np.inf), Above)
+    return Intervals
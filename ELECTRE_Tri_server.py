@@ -0,0 +1,365 @@
+import numpy as np
+import argparse
+import asyncio
+import hashlib
+import json
+import socket
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import ELECTRE_Tri
+import ELECTRE_Tri_io
+
+
+class ScoringModel:
+    """
+    Criteria, weightings and reference profiles of a problem, ready to assign new actions.
+
+    :param CRITERIA: List containing the names of the criteria as strings.
+
+    :param W: Array of shape (criteria,) containing the weightings.
+
+    :param PROFILE_SET: ELECTRE_Tri.ProfileSet of the reference profiles and categories.
+
+    :param LAMBDA: Default cutting threshold, used when a request does not give one.
+    """
+
+    def __init__(self, CRITERIA, W, PROFILE_SET, LAMBDA=0.75):
+        W = np.asarray(W, dtype=float)
+        if W.shape != (len(CRITERIA),) or PROFILE_SET.criteria != list(CRITERIA):
+            raise ValueError('The weightings and the profiles must be given for the criteria '
+                             + str(list(CRITERIA)) + '.')
+        self.criteria = list(CRITERIA)
+        self.weights = W
+        self.profile_set = PROFILE_SET
+        try:
+            self.profiles = PROFILE_SET.compile()
+        except ValueError:
+            self.profiles = PROFILE_SET.values
+        self.cutting_threshold = float(LAMBDA)
+        self.key = model_key(self.criteria, W, PROFILE_SET, self.cutting_threshold)
+
+    def assign(self, G, LAMBDAS=None):
+        """
+        Assigns a batch of actions with both procedures.
+
+        :param G: Array of shape (actions, criteria) containing the performances.
+
+        :param LAMBDAS: Array of shape (actions,) containing the cutting threshold of each
+            action, so that requests using different thresholds can share a batch. The
+            default threshold of the model is used when it is not given.
+
+        :return Pessimistic: Array of shape (actions,) of the pessimistic categories,
+            from 1 (worst) to profiles + 1 (best).
+
+        :return Optimistic: Array of shape (actions,) of the optimistic categories.
+        """
+        Credibility = ELECTRE_Tri.credibility_pipeline(G, self.profiles, self.weights)
+        if LAMBDAS is None:
+            LAMBDAS = self.cutting_threshold
+        Outranking = ELECTRE_Tri.outranking(Credibility, LAMBDAS)
+        return (ELECTRE_Tri.pessimistic_assignment(Outranking),
+                ELECTRE_Tri.optimistic_assignment(Outranking))
+
+
+def model_key(CRITERIA, W, PROFILE_SET, LAMBDA):
+    """
+    Content hash of a model, identical for identical criteria, weightings, profiles,
+    categories and default cutting threshold whatever the files they were read from.
+
+    :return key: Hexadecimal SHA-256 digest.
+    """
+    Hash = hashlib.sha256()
+    Hash.update(json.dumps([list(CRITERIA), PROFILE_SET.profiles, PROFILE_SET.categories,
+                            float(LAMBDA)]).encode())
+    Hash.update(np.ascontiguousarray(W, dtype='<f8').tobytes())
+    Hash.update(np.ascontiguousarray(PROFILE_SET.values, dtype='<f8').tobytes())
+    return Hash.hexdigest()
+
+
+def model_from_request(REQUEST):
+    """
+    Builds a model from a 'load' request, which either gives the names of the files of
+    the criteria ('crit') and of the reference profiles ('profile_files'), or the values
+    themselves ('criteria', 'weights' and 'thresholds', the latter of shape
+    (profiles, criteria, 4)). The names of the profiles ('profiles'), of the categories
+    ('categories') and the default cutting threshold ('lambda') are optional.
+
+    :return model: ScoringModel instance.
+    """
+    if 'crit' in REQUEST:
+        C, W = ELECTRE_Tri_io.load_criteria(REQUEST['crit'])
+        Files = REQUEST['profile_files']
+        B = []
+        Others = {}
+        for name in Files:
+            C_profile, B_profile = ELECTRE_Tri_io.load_profile(name, C)
+            Others[name] = C_profile
+            B.append(B_profile)
+        ELECTRE_Tri_io.check_criteria(C, Others)
+        B = np.stack(B)
+    else:
+        C, W, B = REQUEST['criteria'], REQUEST['weights'], np.asarray(REQUEST['thresholds'], dtype=float)
+    Profiles = REQUEST.get('profiles', ['b' + str(k + 1) for k in range(len(B))])
+    Categories = REQUEST.get('categories', ['C' + str(k + 1) for k in range(len(B) + 1)])
+    Profile_set = ELECTRE_Tri.ProfileSet(C, Profiles, Categories, B)
+    return ScoringModel(C, W, Profile_set, REQUEST.get('lambda', 0.75))
+
+
+class ModelCache:
+    """
+    Least recently used cache of the models, keyed by their content hash.
+
+    :param SIZE: Largest number of models kept.
+    """
+
+    def __init__(self, SIZE=32):
+        self.size = SIZE
+        self._models = OrderedDict()
+
+    def __len__(self):
+        return len(self._models)
+
+    def __contains__(self, key):
+        return key in self._models
+
+    def get(self, key):
+        """
+        Model stored under key, which becomes the most recently used. Raises KeyError if
+        the model is unknown or was evicted.
+        """
+        Model = self._models[key]
+        self._models.move_to_end(key)
+        return Model
+
+    def add(self, MODEL):
+        """
+        Stores a model, or refreshes the one with the same content, and evicts the least
+        recently used models beyond the size of the cache.
+
+        :return Model: The cached model with the same content.
+        """
+        if MODEL.key in self._models:
+            return self.get(MODEL.key)
+        self._models[MODEL.key] = MODEL
+        while len(self._models) > self.size:
+            self._models.popitem(last=False)
+        return MODEL
+
+
+class _Batch:
+    """
+    Requests waiting to be assigned together with the same model.
+    """
+
+    def __init__(self, MODEL):
+        self.model = MODEL
+        self.requests = []
+        self.actions = 0
+
+
+class ScoringServer:
+    """
+    Long-lived scoring service speaking JSON, one object per line, over TCP or a Unix
+    socket. Each request is a JSON object with an 'op' key and an optional 'id' echoed in
+    the response:
+
+    - {"op": "load", ...} builds a model (see model_from_request), caches it and answers
+      {"model": key}.
+    - {"op": "assign", "model": key, "performances": [[...], ...], "actions": [...],
+      "lambda": 0.75} answers the pessimistic and optimistic categories of the actions,
+      as numbers and as names. 'actions' and 'lambda' are optional.
+    - {"op": "stats"} answers the numbers of models, requests and batches.
+
+    Errors are answered as {"error": message}. Assignments requested at the same time
+    for the same model are coalesced into a single vectorised batch, computed in a
+    worker thread while the event loop keeps reading requests.
+
+    :param CACHE_SIZE: Largest number of models kept in memory.
+
+    :param BATCH_DELAY: Seconds a request may wait for other requests to join its batch.
+
+    :param BATCH_SIZE: Number of actions from which a batch is computed without waiting.
+
+    :param WORKERS: Number of worker threads computing the batches.
+    """
+
+    def __init__(self, CACHE_SIZE=32, BATCH_DELAY=0.002, BATCH_SIZE=65536, WORKERS=1):
+        self.models = ModelCache(CACHE_SIZE)
+        self.batch_delay = BATCH_DELAY
+        self.batch_size = BATCH_SIZE
+        self.executor = ThreadPoolExecutor(WORKERS)
+        self.statistics = {'requests': 0, 'assigned_actions': 0, 'batches': 0}
+        self._batches = {}
+
+    async def handle(self, REQUEST):
+        """
+        Answers one request.
+
+        :param REQUEST: Dictionary decoded from the JSON request.
+
+        :return Response: Dictionary to encode as the JSON response.
+        """
+        self.statistics['requests'] += 1
+        if not isinstance(REQUEST, dict):
+            return {'error': 'A request must be a JSON object.'}
+        Response = {'id': REQUEST['id']} if 'id' in REQUEST else {}
+        try:
+            op = REQUEST.get('op')
+            if op == 'load':
+                Model = self.models.add(model_from_request(REQUEST))
+                Response['model'] = Model.key
+            elif op == 'assign':
+                Response.update(await self._assign(REQUEST))
+            elif op == 'stats':
+                Response.update(self.statistics, models=len(self.models))
+            else:
+                raise ValueError('Unknown operation ' + repr(op) + '.')
+        except KeyError as error:
+            Response['error'] = 'Missing or unknown ' + str(error) + '.'
+        except (ValueError, TypeError, OSError) as error:
+            Response['error'] = str(error)
+        return Response
+
+    async def _assign(self, REQUEST):
+        Model = self.models.get(REQUEST['model'])
+        G = np.asarray(REQUEST['performances'], dtype=float)
+        if G.ndim not in (1, 2) or G.shape[-1] != len(Model.criteria):
+            raise ValueError('The performances must be rows of ' + str(len(Model.criteria))
+                             + ' values, got an array of shape ' + str(G.shape) + '.')
+        G = G.reshape(-1, len(Model.criteria))
+        LAMBDA = float(REQUEST.get('lambda', Model.cutting_threshold))
+        Future = asyncio.get_running_loop().create_future()
+        Batch = self._batches.get(Model.key)
+        if Batch is None:
+            Batch = self._batches[Model.key] = _Batch(Model)
+            asyncio.get_running_loop().call_later(self.batch_delay, self._flush, Model.key, Batch)
+        Batch.requests.append((G, LAMBDA, Future))
+        Batch.actions += len(G)
+        if Batch.actions >= self.batch_size:
+            self._flush(Model.key, Batch)
+        Pessimistic, Optimistic = await Future
+        Categories = Model.profile_set.categories
+        Response = {'pessimistic': Pessimistic.tolist(), 'optimistic': Optimistic.tolist(),
+                    'pessimistic_categories': [Categories[k - 1] for k in Pessimistic],
+                    'optimistic_categories': [Categories[k - 1] for k in Optimistic]}
+        if 'actions' in REQUEST:
+            Response['actions'] = REQUEST['actions']
+        return Response
+
+    def _flush(self, key, BATCH):
+        if self._batches.get(key) is not BATCH:
+            return
+        del self._batches[key]
+        Task = asyncio.get_running_loop().run_in_executor(self.executor, self._compute, BATCH)
+        Task.add_done_callback(lambda task: self._resolve(BATCH, task))
+
+    def _compute(self, BATCH):
+        G = np.concatenate([Request[0] for Request in BATCH.requests])
+        LAMBDAS = np.concatenate([np.full(len(Request[0]), Request[1]) for Request in BATCH.requests])
+        return BATCH.model.assign(G, LAMBDAS)
+
+    def _resolve(self, BATCH, TASK):
+        self.statistics['batches'] += 1
+        if TASK.exception() is not None:
+            for _, _, Future in BATCH.requests:
+                Future.set_exception(TASK.exception())
+            return
+        Pessimistic, Optimistic = TASK.result()
+        self.statistics['assigned_actions'] += len(Pessimistic)
+        start = 0
+        for G, _, Future in BATCH.requests:
+            stop = start + len(G)
+            Future.set_result((Pessimistic[start:stop], Optimistic[start:stop]))
+            start = stop
+
+    async def _serve_client(self, reader, writer):
+        Lock = asyncio.Lock()
+
+        async def answer(line):
+            try:
+                Response = await self.handle(json.loads(line))
+            except json.JSONDecodeError as error:
+                Response = {'error': 'Invalid JSON: ' + str(error)}
+            except Exception as error:
+                Response = {'error': type(error).__name__ + ': ' + str(error)}
+            async with Lock:
+                writer.write(json.dumps(Response).encode() + b'\n')
+                await writer.drain()
+
+        Tasks = set()
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    Task = asyncio.create_task(answer(line))
+                    Tasks.add(Task)
+                    Task.add_done_callback(Tasks.discard)
+            if Tasks:
+                await asyncio.gather(*Tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, HOST='127.0.0.1', PORT=8765, PATH=None):
+        """
+        Serves the clients until cancelled. The requests of a connection are answered
+        concurrently, so responses may come back out of order: use their 'id'.
+
+        :param HOST: Address to listen on.
+
+        :param PORT: TCP port to listen on.
+
+        :param PATH: Path of a Unix socket to listen on instead of TCP.
+        """
+        if PATH is not None:
+            server = await asyncio.start_unix_server(self._serve_client, PATH, limit=1 << 26)
+        else:
+            server = await asyncio.start_server(self._serve_client, HOST, PORT, limit=1 << 26)
+        async with server:
+            await server.serve_forever()
+
+
+def request(REQUEST, HOST='127.0.0.1', PORT=8765, PATH=None):
+    """
+    Sends one request to a scoring server and waits for its response.
+
+    :param REQUEST: Dictionary encoded as the JSON request.
+
+    :return Response: Dictionary decoded from the JSON response.
+    """
+    if PATH is not None:
+        connection = socket.socket(socket.AF_UNIX)
+        connection.connect(PATH)
+    else:
+        connection = socket.create_connection((HOST, PORT))
+    with connection, connection.makefile('rwb') as stream:
+        stream.write(json.dumps(REQUEST).encode() + b'\n')
+        stream.flush()
+        return json.loads(stream.readline())
+
+
+def main(ARGS=None):
+    parser = argparse.ArgumentParser(description='Long-lived ELECTRE Tri scoring server (JSON lines).')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port to listen on')
+    parser.add_argument('--unix', help='path of a Unix socket to listen on instead of TCP')
+    parser.add_argument('--cache-size', type=int, default=32, help='largest number of cached models')
+    parser.add_argument('--batch-delay', type=float, default=0.002,
+                        help='seconds a request may wait for others to join its batch')
+    parser.add_argument('--batch-size', type=int, default=65536,
+                        help='number of actions from which a batch is computed without waiting')
+    parser.add_argument('--workers', type=int, default=1, help='number of threads computing the batches')
+    Arguments = parser.parse_args(ARGS)
+
+    Server = ScoringServer(Arguments.cache_size, Arguments.batch_delay, Arguments.batch_size, Arguments.workers)
+    try:
+        asyncio.run(Server.serve(Arguments.host, Arguments.port, Arguments.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())